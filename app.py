@@ -1,13 +1,47 @@
-import gradio as gr
+import argparse
+import atexit
 import json
 import os
+import shutil
+import sys
+import threading
+from html import escape
 from pathlib import Path
 
+from catalog import load_catalog
+from config_diff import changed_categories
+from deploy import deploy, open_target, remove_stale_files, write_manifest
+from fragment_cache import FragmentCache
+from render import (
+    CATEGORIES_GRID_OPEN, GRID_CLOSE, GRID_OPEN, NO_ITEMS_HTML, render_categories_grid,
+    render_category_card, render_entries_grid, render_header, render_item_card,
+    render_items_grid, render_shards, to_html
+)
+from search import SearchIndex
+from storage import category_slug, open_storage
+from timing import TIMINGS_ENV, StartupTimer
+from watcher import ConfigWatcher
+
+CONFIG_FILE = Path(__file__).parent / "config.json"
+
+DEFAULT_PAGE_SIZE = 100
+# Seconds between config.json checks (and page polls) with hot reload on
+HOT_RELOAD_INTERVAL = 2.0
+SEARCH_LIMIT = 50
+# Tag facets are counted over every match, so skip them for very broad queries
+FACET_MAX_MATCHES = 20_000
+
+# Rendered cards, shared by every tab. Set HF_SITE_DISK_CACHE=1 to also keep
+# them in .card_cache.json next to config.json across restarts.
+CARD_CACHE_FILE = Path(__file__).parent / ".card_cache.json"
+card_cache = FragmentCache(
+    render_item_card,
+    path=CARD_CACHE_FILE if os.environ.get("HF_SITE_DISK_CACHE") else None
+)
+
 def load_config():
-    """Load configuration from config.json"""
-    config_path = Path(__file__).parent / "config.json"
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Load configuration from config.json (or the sharded config.d/)"""
+    return load_catalog(open_storage(CONFIG_FILE))
 
 def get_custom_css():
     """Load custom CSS if available"""
@@ -19,128 +53,333 @@ def get_custom_css():
 
 def create_category_card(category):
     """Create HTML for a category card"""
-    return f"""
-    <div class="category-card">
-        <div class="category-icon">{category['icon']}</div>
-        <h3>{category['name']}</h3>
-        <p>{category['description']}</p>
-    </div>
-    """
+    return to_html(render_category_card, category)
 
 def create_model_card(item, item_type="model"):
     """Create HTML for a model or dataset card"""
-    tags_html = " ".join([f'<span class="tag">{tag}</span>' for tag in item.get('tags', [])])
-
-    links = []
-    if item.get('repo'):
-        links.append(f'<a href="https://huggingface.co/{item["repo"]}" target="_blank" class="card-link">🤗 View on HF</a>')
-    if item.get('demo_url'):
-        links.append(f'<a href="{item["demo_url"]}" target="_blank" class="card-link">🚀 Demo</a>')
-    if item.get('paper_url'):
-        links.append(f'<a href="{item["paper_url"]}" target="_blank" class="card-link">📄 Paper</a>')
-
-    links_html = " ".join(links)
-
-    size_info = f'<div class="card-size">{item["size"]}</div>' if item.get('size') else ''
-
-    return f"""
-    <div class="item-card">
-        <h3>{item['name']}</h3>
-        <p class="card-description">{item.get('description', '')}</p>
-        {size_info}
-        <div class="card-tags">{tags_html}</div>
-        <div class="card-links">{links_html}</div>
-    </div>
-    """
+    return card_cache.get(item, item_type)
 
 def create_header(config):
     """Create site header"""
-    site = config['site']
-    social_links = []
-
-    if site['social_links'].get('github'):
-        social_links.append(f'<a href="{site["social_links"]["github"]}" target="_blank">GitHub</a>')
-    if site['social_links'].get('twitter'):
-        social_links.append(f'<a href="{site["social_links"]["twitter"]}" target="_blank">Twitter</a>')
-    if site['social_links'].get('linkedin'):
-        social_links.append(f'<a href="{site["social_links"]["linkedin"]}" target="_blank">LinkedIn</a>')
-
-    social_html = " · ".join(social_links) if social_links else ""
-
-    return f"""
-    <div class="site-header">
-        <h1>{site['title']}</h1>
-        <p class="site-description">{site['description']}</p>
-        <p class="site-author">by {site['author']}</p>
-        <div class="social-links">{social_html}</div>
-    </div>
-    """
+    return to_html(render_header, config['site'])
 
-def create_category_section(config, category_id):
-    """Create a section showing items from a specific category"""
-    models = [m for m in config.get('models', []) if m.get('category') == category_id]
-    datasets = [d for d in config.get('datasets', []) if d.get('category') == category_id]
+def build_category_index(config):
+    """Bucket models and datasets by category in a single pass
 
-    html = "<div class='items-grid'>"
-
-    for model in models:
-        html += create_model_card(model, "model")
-
-    for dataset in datasets:
-        html += create_model_card(dataset, "dataset")
-
-    html += "</div>"
+    Returns a dict mapping category id -> {'models': [...], 'datasets': [...]},
+    preserving the order items appear in the config.
+    """
+    index = {}
+    for key in ('models', 'datasets'):
+        for item in config.get(key, []):
+            bucket = index.get(item.get('category'))
+            if bucket is None:
+                bucket = index[item.get('category')] = {'models': [], 'datasets': []}
+            bucket[key].append(item)
+    return index
+
+def create_category_section(config, category_id, index=None):
+    """Create a section showing items from a specific category
+
+    Pass a prebuilt `build_category_index` result as `index` when rendering
+    several categories, so the config is not rescanned for each one.
+    """
+    if index is None:
+        index = build_category_index(config)
+    bucket = index.get(category_id, {})
+    models = bucket.get('models', [])
+    datasets = bucket.get('datasets', [])
 
     if not models and not datasets:
-        html = "<p class='no-items'>No items in this category yet.</p>"
+        return NO_ITEMS_HTML
+
+    return to_html(render_items_grid, models, datasets, card_cache.render_item_card)
 
-    return html
+def create_all_items_section(config, workers=1):
+    """Create the grid with every model and dataset
 
-def build_interface():
-    """Build the Gradio interface"""
-    config = load_config()
-    custom_css = get_custom_css()
+    With `workers` > 1 the cards are rendered by a process pool (see
+    `render.render_shards`); the output is identical either way.
+    """
+    if workers > 1:
+        entries = build_page_index(config, {})[None]
+        return GRID_OPEN + render_shards([entries], workers)[0] + GRID_CLOSE
+    return to_html(
+        render_items_grid, config.get('models', []), config.get('datasets', []),
+        card_cache.render_item_card
+    )
+
+def build_page_index(config, index):
+    """Precompute the ``(item, item_type)`` sequence every paged grid slices
+
+    Keys are category ids, plus None for the All Items grid.
+    """
+    pages = {
+        category_id: [(m, "model") for m in bucket['models']] + [(d, "dataset") for d in bucket['datasets']]
+        for category_id, bucket in index.items()
+    }
+    pages[None] = (
+        [(m, "model") for m in config.get('models', [])] +
+        [(d, "dataset") for d in config.get('datasets', [])]
+    )
+    return pages
+
+def page_count(entries, page_size):
+    """Number of pages needed for `entries` (at least one)"""
+    return max(1, -(-len(entries) // page_size)) if page_size else 1
+
+def create_page_section(entries, page, page_size):
+    """Render one page of `entries`; costs O(page_size), not O(entries)
+
+    Returns ``(html, page, page_count)`` with `page` clamped to the valid range.
+    A `page_size` of 0 renders every entry on a single page.
+    """
+    pages = page_count(entries, page_size)
+    page = min(max(page, 0), pages - 1)
+    if not entries:
+        return NO_ITEMS_HTML, page, pages
+
+    if page_size:
+        start = page * page_size
+        entries = entries[start:start + page_size]
+    return to_html(render_entries_grid, entries, card_cache.render_item_card), page, pages
+
+def create_search_results(search_index, query, limit=SEARCH_LIMIT):
+    """Render the results of a search query"""
+    if not query or not query.strip():
+        return ""
+
+    total, entries = search_index.search(query, limit=limit)
+    if not total:
+        return f"<p class='no-items'>No results for “{escape(query)}”.</p>"
+
+    summary = f"{total} result{'s' if total != 1 else ''}"
+    if total > len(entries):
+        summary += f", showing the top {len(entries)}"
+    out = [f"<p class='search-summary'>{summary}</p>"]
+
+    if total <= FACET_MAX_MATCHES:
+        facets = search_index.facets(query)
+        if facets:
+            out.append("<p class='search-facets'>Refine: ")
+            out.append(" ".join(
+                f'<span class="tag">tag:{escape(tag)} ({count})</span>' for tag, count in facets
+            ))
+            out.append("</p>")
+
+    render_entries_grid(out, entries, card_cache.render_item_card)
+    return "".join(out)
+
+class SiteContent:
+    """The loaded config plus everything derived from it
+
+    Holds the page and search indexes and memoizes rendered pages. `reload()`
+    swaps in a new config and forgets only the pages of categories whose
+    items changed; `version` is bumped on every effective reload so open
+    sessions can tell they are stale.
+    """
 
-    with gr.Blocks(
+    # Change sets kept for sessions that fall behind by several versions
+    HISTORY = 100
+
+    def __init__(self, config, page_size):
+        self.page_size = page_size
+        self.version = 0
+        self.history = []
+        self._lock = threading.Lock()
+        self._rendered_pages = {}
+        self._index(config)
+
+    def _index(self, config):
+        self.config = config
+        self.page_index = build_page_index(config, build_category_index(config))
+        self.search_index = SearchIndex(self.page_index[None])
+
+    def render_page(self, category_id, page=0):
+        """Render one page of a tab once and memoize it (None means All Items)"""
+        key = (category_id, page)
+        # A concurrent reload replaces both dicts; keep this render consistent
+        with self._lock:
+            rendered_pages, page_index = self._rendered_pages, self.page_index
+            result = rendered_pages.get(key)
+        if result is None:
+            # Rendered outside the lock, so tabs don't wait for each other
+            result = create_page_section(page_index.get(category_id, []), page, self.page_size)
+            with self._lock:
+                # A page of the previous config must not land in the new dict
+                if self._rendered_pages is rendered_pages:
+                    rendered_pages[key] = result
+        return result
+
+    def reload(self, config):
+        """Swap in `config`; return the set of changed category ids
+
+        The set includes None (All Items) when any item changed. Returns an
+        empty set when nothing visible changed.
+        """
+        changed = changed_categories(self.config, config)
+        if changed:
+            changed.add(None)
+        structure_changed = (
+            config.get('site') != self.config.get('site') or
+            config.get('categories') != self.config.get('categories')
+        )
+        if not changed and not structure_changed:
+            return set()
+
+        with self._lock:
+            self._index(config)
+            self._rendered_pages = {
+                key: result for key, result in self._rendered_pages.items()
+                if key[0] not in changed
+            }
+            self.version += 1
+            self.history.append((self.version, changed, structure_changed))
+            del self.history[:-self.HISTORY]
+        return changed
+
+    def changes_since(self, version):
+        """Return ``(changed categories, structure_changed)`` since `version`
+
+        Returns ``(None, True)`` if `version` is older than the kept history.
+        """
+        if self.history and version < self.history[0][0] - 1:
+            return None, True
+        changed, structure_changed = set(), False
+        for entry_version, entry_changed, entry_structure in self.history:
+            if entry_version > version:
+                changed |= entry_changed
+                structure_changed = structure_changed or entry_structure
+        return changed, structure_changed
+
+def build_interface(lazy_tabs=None, page_size=None, hot_reload=None):
+    """Build the Gradio interface
+
+    With `lazy_tabs` (default: the HF_SITE_LAZY_TABS env var) only the first
+    tab is rendered at startup; every other tab starts empty and is rendered
+    on its first `select` event, then memoized for all visitors.
+
+    Grids are split into pages of `page_size` cards (default: the
+    HF_SITE_PAGE_SIZE env var, or DEFAULT_PAGE_SIZE) with prev/next
+    controls; 0 disables paging.
+
+    With `hot_reload` (default: the HF_SITE_HOT_RELOAD env var) the config
+    (config.json, or the manifest of a sharded config.d/, plus the
+    config.journal of builder.py edits) is watched for changes; only
+    categories whose items changed are re-rendered and open pages pick the
+    updates up on their next poll.
+    Renamed or re-described categories update their tab's label and
+    description. Adding or removing categories still needs a restart,
+    since tabs can't be created in a running Blocks.
+
+    Set HF_SITE_TIMINGS=1 (and/or HF_SITE_TIMINGS_FILE=<path>) to emit a JSON
+    startup report with per-stage durations, item counts and HTML bytes.
+    """
+    timer = StartupTimer.from_env()
+
+    # Imported here so the static export never pays for loading Gradio
+    with timer.stage("import_gradio"):
+        import gradio as gr
+
+    if lazy_tabs is None:
+        lazy_tabs = bool(os.environ.get("HF_SITE_LAZY_TABS"))
+    if page_size is None:
+        page_size = int(os.environ.get("HF_SITE_PAGE_SIZE", DEFAULT_PAGE_SIZE))
+    if hot_reload is None:
+        hot_reload = bool(os.environ.get("HF_SITE_HOT_RELOAD"))
+
+    with timer.stage("load_config") as stage:
+        config = load_config()
+        stage.add(
+            categories=len(config.get('categories', [])),
+            models=len(config.get('models', [])),
+            datasets=len(config.get('datasets', []))
+        )
+    with timer.stage("index"):
+        content = SiteContent(config, page_size)
+    with timer.stage("load_css") as stage:
+        custom_css = get_custom_css()
+        stage.add(css_bytes=len(custom_css))
+
+    def timed_html(render, *args):
+        """Render startup HTML under the "html" stage"""
+        with timer.stage("html") as stage:
+            html = render(*args)
+            stage.add(fragments=1, html_bytes=len(html))
+        return html
+
+    def show_page(category_id, page):
+        html, page, pages = content.render_page(category_id, page)
+        return html, page, f"Page {page + 1} of {pages}"
+
+    # (category id, html, page state, page label, page row) for every tab
+    tabs = []
+    # (category id, tab, description) for every category tab
+    tab_headers = []
+
+    def add_tab_html(tab, category_id, first):
+        if not lazy_tabs or first:
+            tab_html = gr.HTML(timed_html(lambda: content.render_page(category_id)[0]))
+        else:
+            tab_html = gr.HTML()
+
+        pages = page_count(content.page_index.get(category_id, []), page_size)
+        page_state = gr.State(0)
+        with gr.Row(visible=pages > 1) as page_row:
+            prev_btn = gr.Button("◀ Prev", size="sm")
+            page_label = gr.Markdown(f"Page 1 of {pages}")
+            next_btn = gr.Button("Next ▶", size="sm")
+
+        outputs = [tab_html, page_state, page_label]
+        prev_btn.click(lambda page: show_page(category_id, page - 1), inputs=page_state, outputs=outputs)
+        next_btn.click(lambda page: show_page(category_id, page + 1), inputs=page_state, outputs=outputs)
+        if lazy_tabs and not first:
+            tab.select(lambda page: show_page(category_id, page), inputs=page_state, outputs=outputs)
+        tabs.append((category_id, tab_html, page_state, page_label, page_row))
+
+    with timer.stage("blocks"), gr.Blocks(
         title=config['site']['title'],
         css=custom_css,
         theme=gr.themes.Soft(primary_hue="indigo")
     ) as demo:
 
         # Header
-        gr.HTML(create_header(config))
+        header_html = gr.HTML(timed_html(create_header, config))
 
         # Categories Overview
         gr.Markdown("## 📂 Categories", elem_classes="section-title")
 
-        categories_html = "<div class='categories-grid'>"
-        for category in config['categories']:
-            categories_html += create_category_card(category)
-        categories_html += "</div>"
-
-        gr.HTML(categories_html)
+        categories_html = gr.HTML(timed_html(to_html, render_categories_grid, config['categories']))
+
+        # Search
+        gr.Markdown("## 🔍 Search", elem_classes="section-title")
+        search_box = gr.Textbox(
+            placeholder="Search models and datasets, e.g. classifier tag:bert",
+            show_label=False
+        )
+        search_results = gr.HTML()
+        search_box.change(
+            lambda query: create_search_results(content.search_index, query),
+            inputs=search_box,
+            outputs=search_results,
+            trigger_mode="always_last"
+        )
 
         # Create tabs for each category
         with gr.Tabs():
-            for category in config['categories']:
-                with gr.Tab(f"{category['icon']} {category['name']}"):
-                    gr.Markdown(f"### {category['description']}")
-                    category_html = create_category_section(config, category['id'])
-                    gr.HTML(category_html)
+            for position, category in enumerate(config['categories']):
+                with gr.Tab(category_tab_label(category)) as tab:
+                    description = gr.Markdown(category_tab_description(category))
+                    add_tab_html(tab, category['id'], position == 0)
+                tab_headers.append((category['id'], tab, description))
 
             # All items tab
-            with gr.Tab("🌐 All Items"):
+            with gr.Tab("🌐 All Items") as tab:
                 gr.Markdown("### All Models and Datasets")
-                all_html = "<div class='items-grid'>"
+                add_tab_html(tab, None, not config['categories'])
 
-                for model in config.get('models', []):
-                    all_html += create_model_card(model, "model")
-
-                for dataset in config.get('datasets', []):
-                    all_html += create_model_card(dataset, "dataset")
-
-                all_html += "</div>"
-                gr.HTML(all_html)
+        if hot_reload:
+            add_hot_reload(gr, content, header_html, categories_html, tabs, tab_headers)
 
         # Footer
         gr.Markdown("""
@@ -152,8 +391,221 @@ def build_interface():
         </div>
         """)
 
+    with timer.stage("card_cache_save"):
+        card_cache.save()
+    timer.report({"card_cache": card_cache.stats(), "lazy_tabs": lazy_tabs, "page_size": page_size})
+
     return demo
 
-if __name__ == "__main__":
+def category_tab_label(category):
+    return f"{category['icon']} {category['name']}"
+
+def category_tab_description(category):
+    return f"### {category['description']}"
+
+def add_hot_reload(gr, content, header_html, categories_html, tabs, tab_headers):
+    """Watch config.json and push changed categories into open pages
+
+    Each page polls with a `gr.Timer`; when the server-side version moved on
+    it receives new HTML for the changed tabs only, everything else is left
+    untouched.
+    """
+    def on_change():
+        changed = content.reload(load_config())
+        if changed:
+            print(f"🔄 Reloaded configuration: {len(changed - {None})} categories changed")
+
+    ConfigWatcher(open_storage(CONFIG_FILE).watch_paths, on_change, interval=HOT_RELOAD_INTERVAL).start()
+
+    if not hasattr(gr, "Timer"):
+        print("⚠️ Live updates need gradio>=4.40; reload the page to see config changes")
+        return
+
+    version_state = gr.State(content.version)
+    page_states = [page_state for _, _, page_state, _, _ in tabs]
+    outputs = [version_state, header_html, categories_html]
+    for _, tab, description in tab_headers:
+        outputs += [tab, description]
+    for _, tab_html, page_state, page_label, page_row in tabs:
+        outputs += [tab_html, page_state, page_label, page_row]
+
+    def refresh(version, *pages):
+        if version == content.version:
+            return [gr.update()] * len(outputs)
+
+        changed, structure_changed = content.changes_since(version)
+        config = content.config
+        updates = [content.version]
+        if structure_changed:
+            updates += [create_header(config), to_html(render_categories_grid, config['categories'])]
+            categories = {c['id']: c for c in config['categories']}
+            for category_id, _, _ in tab_headers:
+                # A removed category keeps its tab until the restart
+                category = categories.get(category_id)
+                if category is None:
+                    updates += [gr.update(), gr.update()]
+                else:
+                    updates += [gr.update(label=category_tab_label(category)), category_tab_description(category)]
+        else:
+            updates += [gr.update()] * (2 + 2 * len(tab_headers))
+
+        for (category_id, _, _, _, _), page in zip(tabs, pages):
+            if changed is not None and category_id not in changed:
+                updates += [gr.update()] * 4
+                continue
+            html, page, pages_total = content.render_page(category_id, page)
+            updates += [
+                html, page, f"Page {page + 1} of {pages_total}", gr.update(visible=pages_total > 1)
+            ]
+        return updates
+
+    timer = gr.Timer(HOT_RELOAD_INTERVAL)
+    timer.tick(refresh, inputs=[version_state] + page_states, outputs=outputs, show_progress="hidden")
+
+FOOTER_HTML = """
+<div class="site-footer">
+    Built with <a href="https://github.com/marduk191/hf_site_builder" target="_blank">HF Site Builder</a>
+</div>
+"""
+
+def category_page_name(category_id):
+    """Return the static file name for a category page, relative to the index
+
+    Category pages live in their own directory, so no category id can
+    overwrite index.html or style.css.
+    """
+    return f"category/{category_slug(category_id)}.html"
+
+def render_static_page(config, title, body_html, root=""):
+    """Wrap rendered HTML in a standalone page; `root` is the path back to
+    the export directory (e.g. "../")"""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>{escape(title)}</title>
+    <link rel="stylesheet" href="{root}style.css">
+</head>
+<body>
+<div class="static-site">
+    {create_header(config)}
+    {body_html}
+    {FOOTER_HTML}
+</div>
+</body>
+</html>
+"""
+
+def export_site(out_dir, config=None, workers=1):
+    """Write the site as static HTML files (index plus one page per category)
+
+    With `workers` > 1 all category grids are rendered up front by a process
+    pool; the files written are byte-identical to a serial export. A
+    content-hash manifest of the files (see deploy.py) is written last;
+    files the previous export's manifest lists but this one doesn't
+    produce (e.g. pages of removed categories) are deleted first.
+    """
+    config = config if config is not None else load_config()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    site_title = config['site']['title']
+
+    # Index: category overview linking to each category page
+    out = ["<h2 class='section-title'>📂 Categories</h2>", CATEGORIES_GRID_OPEN]
+    for category in config['categories']:
+        out.append(f'<a class="category-link" href="{category_page_name(category["id"])}">')
+        render_category_card(out, category)
+        out.append("</a>")
+    out.append(GRID_CLOSE)
+    index_body = "".join(out)
+    written = [out_dir / "index.html"]
+    written[0].write_text(render_static_page(config, site_title, index_body), encoding='utf-8')
+
+    # One page per category
+    category_index = build_category_index(config)
+    sections = {}
+    if workers > 1:
+        page_index = build_page_index(config, category_index)
+        category_ids = [c['id'] for c in config['categories']]
+        shards = [page_index.get(category_id, []) for category_id in category_ids]
+        for category_id, entries, body in zip(category_ids, shards, render_shards(shards, workers)):
+            sections[category_id] = GRID_OPEN + body + GRID_CLOSE if entries else NO_ITEMS_HTML
+
+    nav_html = '<p class="static-nav"><a href="../index.html">← All categories</a></p>'
+    (out_dir / "category").mkdir(exist_ok=True)
+    for category in config['categories']:
+        body = (
+            f"{nav_html}"
+            f"<h2 class='section-title'>{escape(category['icon'])} {escape(category['name'])}</h2>"
+            f"<p class='category-description'>{escape(category['description'])}</p>"
+            f"{sections.get(category['id']) or create_category_section(config, category['id'], category_index)}"
+        )
+        page_path = out_dir / category_page_name(category['id'])
+        page_path.write_text(
+            render_static_page(config, f"{category['name']} · {site_title}", body, root="../"),
+            encoding='utf-8'
+        )
+        written.append(page_path)
+
+    css_path = Path(__file__).parent / "static" / "style.css"
+    if css_path.exists():
+        shutil.copyfile(css_path, out_dir / "style.css")
+        written.append(out_dir / "style.css")
+
+    remove_stale_files(out_dir, written)
+    write_manifest(out_dir, written)
+    card_cache.save()
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="HF Site Builder - Hugging Face Space app")
+    subparsers = parser.add_subparsers(dest='command')
+
+    export_parser = subparsers.add_parser('export', help='Export the site as static HTML')
+    export_parser.add_argument('--out', default='dist', help='Output directory (default: dist)')
+    export_parser.add_argument(
+        '--workers', type=int, default=1,
+        help='Render cards with this many processes (default: 1, serial)'
+    )
+
+    deploy_parser = subparsers.add_parser('deploy', help='Export the site and send it to a directory or HTTP server')
+    deploy_parser.add_argument('target', help='Directory, or http(s) URL accepting PUT and DELETE')
+    deploy_parser.add_argument('--out', default='dist', help='Export directory (default: dist)')
+    deploy_parser.add_argument('--workers', type=int, default=1, help='Render cards with this many processes')
+    deploy_parser.add_argument('--incremental', action='store_true', help="Only send files whose hash differs from the target's manifest")
+    deploy_parser.add_argument('--dry-run', action='store_true', help='Show what would be sent without sending it')
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        written = export_site(args.out, workers=args.workers)
+        print(f"✅ Exported {len(written)} files to {args.out}")
+        if os.environ.get(TIMINGS_ENV):
+            print(f"Card cache: {json.dumps(card_cache.stats())}")
+        return
+
+    if args.command == 'deploy':
+        written = export_site(args.out, workers=args.workers)
+        target = open_target(args.target)
+        try:
+            uploaded, deleted, unchanged = deploy(args.out, target, args.incremental, args.dry_run)
+        except OSError as e:
+            print(f"❌ Deploy to {target} failed: {e}")
+            sys.exit(1)
+        verb = "Would send" if args.dry_run else "Sent"
+        for name in uploaded[:20]:
+            print(f"  + {name}")
+        for name in deleted[:20]:
+            print(f"  - {name}")
+        print(f"✅ {verb} {len(uploaded)} of {len(written)} files to {target} "
+              f"({unchanged} unchanged, {len(deleted)} deleted)")
+        return
+
     demo = build_interface()
+    # Pages rendered while serving are only written back at exit
+    atexit.register(card_cache.save)
     demo.launch()
+
+if __name__ == "__main__":
+    main()
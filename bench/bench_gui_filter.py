@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Keystroke latency benchmark for the GUI's item filter (item_filter.py)
+
+Builds an ItemFilter over the models of a synthetic catalog and times
+what the table does per keystroke - `view()` for the query typed so far
+- while "typing" a few queries one character at a time, unsorted and
+sorted by each column. Also times the first keystroke (which builds the
+index), a sort click and an add/remove. The GUI renders only the visible
+rows on top of this, which is independent of the catalog size.
+
+Usage:
+    python bench/bench_gui_filter.py [--items 100000] [--queries "model 42,tag:tag-3 mod,1"]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from catalog import compact  # noqa: E402
+from gen_config import generate_config  # noqa: E402
+from item_filter import SORT_COLUMNS, ItemFilter  # noqa: E402
+
+def ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GUI filter keystroke latency")
+    parser.add_argument('--items', type=int, default=100_000, help='Number of models')
+    parser.add_argument('--queries', default='model 42,tag:tag-3 mod,1,zzz',
+                        help='Comma-separated queries, typed one character at a time')
+    args = parser.parse_args()
+
+    config = compact(generate_config(models=args.items, datasets=0))
+    items = ItemFilter(config['models'])
+    print(f"{args.items} items")
+
+    build_ms, _ = ms(lambda: items.view("m"))
+    print(f"first keystroke (builds the index): {build_ms:.1f} ms")
+    for column in SORT_COLUMNS:
+        sort_ms, _ = ms(lambda: items.view("", column))
+        print(f"first sort by {column}: {sort_ms:.1f} ms")
+
+    print(f"{'query':>16} {'sort':>9} {'keys':>5} {'max ms':>8} {'mean ms':>8} {'shown':>7}")
+    worst = 0.0
+    for query in args.queries.split(','):
+        for column in (None, *SORT_COLUMNS):
+            times = []
+            for end in range(1, len(query) + 1):
+                elapsed, view = ms(lambda: items.view(query[:end], column))
+                times.append(elapsed)
+            worst = max(worst, max(times))
+            print(f"{query:>16} {column or '-':>9} {len(times):>5} {max(times):>8.2f} "
+                  f"{sum(times) / len(times):>8.2f} {len(view):>7}")
+
+    add_ms, item_id = ms(lambda: items.add({"name": "Model new", "repo": "u/new", "category": "cat-0", "tags": ["new"]}))
+    remove_ms, _ = ms(lambda: items.remove(items.index_of(item_id)))
+    print(f"add {add_ms:.2f} ms, remove {remove_ms:.2f} ms (with every index and sort order live)")
+    print(f"slowest keystroke: {worst:.1f} ms")
+
+if __name__ == '__main__':
+    main()
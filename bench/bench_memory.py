@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the compact item representation (catalog.py)
+
+Serializes a synthetic catalog, parses it back the way the storages do
+(so every tag and category string is a separate object, as after a real
+load), and measures with tracemalloc what the loaded config holds as
+plain dicts and after `catalog.compact()`. Also times the conversion, a
+pass of ``item['name']`` lookups over both, and `to_json` serialization.
+
+Usage:
+    python bench/bench_memory.py [--items 200000] [--categories 20]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from catalog import compact  # noqa: E402
+from gen_config import generate_config  # noqa: E402
+from parse_cache import parse  # noqa: E402
+from storage import dump_json  # noqa: E402
+
+def retained(build):
+    """Bytes still allocated by `build()`'s result, and the result"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def scan(config):
+    return sum(len(item['name']) for key in ('models', 'datasets') for item in config[key])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark item memory use: dicts vs catalog.Item")
+    parser.add_argument('--items', type=int, default=200_000, help='Total models + datasets')
+    parser.add_argument('--categories', type=int, default=20, help='Number of categories')
+    args = parser.parse_args()
+
+    models = args.items * 4 // 5
+    raw = json.dumps(generate_config(categories=args.categories, models=models, datasets=args.items - models)).encode('utf-8')
+
+    dict_bytes, plain = retained(lambda: parse(raw))
+    compact_bytes, packed = retained(lambda: compact(parse(raw)))
+    compact_seconds, _ = timed(lambda: compact(parse(raw)))
+    parse_seconds, _ = timed(lambda: parse(raw))
+
+    print(f"{args.items} items, {len(raw) / 2**20:.1f} MiB of JSON")
+    print(f"{'':>10} {'MiB':>9} {'bytes/item':>11} {'load s':>8} {'scan s':>8} {'dump s':>8}")
+    for label, size, load_seconds, config in (
+        ("dicts", dict_bytes, parse_seconds, plain),
+        ("compact", compact_bytes, compact_seconds, packed),
+    ):
+        scan_seconds, _ = timed(lambda: scan(config))
+        dump_seconds, text = timed(lambda: dump_json(config))
+        print(f"{label:>10} {size / 2**20:>9.1f} {size / args.items:>11.0f} "
+              f"{load_seconds:>8.3f} {scan_seconds:>8.3f} {dump_seconds:>8.3f}")
+    print(f"compact uses {compact_bytes / dict_bytes:.0%} of the dict memory; "
+          f"identical JSON: {dump_json(plain) == dump_json(packed)}")
+
+if __name__ == '__main__':
+    main()
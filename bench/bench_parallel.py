@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for parallel card rendering (render.render_shards)
+
+Renders a synthetic catalog with 1, 2, 4, 8 and 16 workers, checks that
+every run is byte-identical to the serial output, and reports wall time
+and speedup.
+
+Usage:
+    python bench/bench_parallel.py [--items 200000] [--workers 1,2,4,8,16] [--categories 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from gen_config import generate_config  # noqa: E402
+from render import render_shards  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel card rendering")
+    parser.add_argument('--items', type=int, default=200_000, help='Total models + datasets')
+    parser.add_argument('--categories', type=int, default=20, help='Number of categories (one shard each)')
+    parser.add_argument('--workers', default='1,2,4,8,16', help='Comma-separated worker counts')
+    args = parser.parse_args()
+
+    models = args.items * 4 // 5
+    config = generate_config(categories=args.categories, models=models, datasets=args.items - models)
+    shards = {c['id']: [] for c in config['categories']}
+    for key, item_type in (('models', 'model'), ('datasets', 'dataset')):
+        for item in config[key]:
+            shards[item['category']].append((item, item_type))
+    shards = list(shards.values())
+
+    print(f"{args.items} items in {len(shards)} shards, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}  identical")
+    baseline = serial_time = None
+    for workers in (int(w) for w in args.workers.split(',')):
+        start = time.perf_counter()
+        result = render_shards(shards, workers)
+        seconds = time.perf_counter() - start
+        if baseline is None:
+            baseline, serial_time = result, seconds
+        print(f"{workers:>8} {seconds:>10.3f} {serial_time / seconds:>7.2f}x  {result == baseline}")
+
+if __name__ == '__main__':
+    main()
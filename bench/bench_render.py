@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: join-based rendering engine vs. the original
+f-string + ``+=`` card rendering, both unescaped (as it was) and with
+html.escape applied to every field (the same output the engine produces).
+
+Usage:
+    python bench/bench_render.py [--sizes 10000,100000,1000000] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from html import escape
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from render import render_items_grid, to_html  # noqa: E402
+
+def legacy_card(item):
+    """The card renderer as it was before the rendering engine"""
+    tags_html = " ".join([f'<span class="tag">{tag}</span>' for tag in item.get('tags', [])])
+
+    links = []
+    if item.get('repo'):
+        links.append(f'<a href="https://huggingface.co/{item["repo"]}" target="_blank" class="card-link">🤗 View on HF</a>')
+    if item.get('demo_url'):
+        links.append(f'<a href="{item["demo_url"]}" target="_blank" class="card-link">🚀 Demo</a>')
+    if item.get('paper_url'):
+        links.append(f'<a href="{item["paper_url"]}" target="_blank" class="card-link">📄 Paper</a>')
+
+    links_html = " ".join(links)
+
+    size_info = f'<div class="card-size">{item["size"]}</div>' if item.get('size') else ''
+
+    return f"""
+    <div class="item-card">
+        <h3>{item['name']}</h3>
+        <p class="card-description">{item.get('description', '')}</p>
+        {size_info}
+        <div class="card-tags">{tags_html}</div>
+        <div class="card-links">{links_html}</div>
+    </div>
+    """
+
+def escaped_legacy_card(item):
+    """The legacy renderer with html.escape applied to every field,
+    i.e. the same output the engine produces"""
+    item = {
+        key: [escape(str(v)) for v in value] if isinstance(value, list)
+        else escape(str(value)) if value else value
+        for key, value in item.items()
+    }
+    return legacy_card(item)
+
+def legacy_grid(models, card=legacy_card):
+    html = "<div class='items-grid'>"
+    for model in models:
+        html += card(model)
+    html += "</div>"
+    return html
+
+def make_items(n):
+    return [
+        {
+            "name": f"Model {i}",
+            "repo": f"user{i % 97}/model-{i}",
+            "category": f"cat{i % 20}",
+            "description": f"A fine-tuned model number {i} for text classification",
+            "tags": ["classification", "bert", f"tag{i % 50}"],
+            "demo_url": f"https://huggingface.co/spaces/user/demo-{i}" if i % 3 == 0 else None,
+            "paper_url": None,
+        }
+        for i in range(n)
+    ]
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated card counts')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    print(f"{'cards':>10} {'legacy (s)':>12} {'legacy+esc (s)':>15} {'engine (s)':>12} {'vs +esc':>8}")
+    for n in (int(s) for s in args.sizes.split(',')):
+        items = make_items(n)
+        legacy = best_of(lambda: legacy_grid(items), args.repeat)
+        legacy_escaped = best_of(lambda: legacy_grid(items, escaped_legacy_card), args.repeat)
+        engine = best_of(lambda: to_html(render_items_grid, items, []), args.repeat)
+        print(f"{n:>10} {legacy:>12.3f} {legacy_escaped:>15.3f} {engine:>12.3f} {legacy_escaped / engine:>7.2f}x")
+
+if __name__ == '__main__':
+    main()
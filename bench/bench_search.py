@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Query latency benchmark for the in-app search index (search.py)
+
+Builds a SearchIndex over a synthetic catalog (compact items, as app.py
+loads them) and times `search()` plus `facets()` - what a keystroke in
+the search box costs - for a few queries, each run several times. The
+query is computed afresh on every run; `facets()` reuses the match set
+of the `search()` before it, as in the app. The index build is timed once.
+
+Usage:
+    python bench/bench_search.py [--items 1000000] [--queries "model text,large small open,tag:tag-3 model"]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from catalog import compact  # noqa: E402
+from gen_config import generate_config  # noqa: E402
+from search import SearchIndex  # noqa: E402
+
+def ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search and facet latency")
+    parser.add_argument('--items', type=int, default=1_000_000, help='Total models + datasets')
+    parser.add_argument('--queries', default='model text,large small open,tag:tag-3 model,dataset 42,zzz',
+                        help='Comma-separated queries')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query (the best is reported)')
+    args = parser.parse_args()
+
+    models = args.items * 4 // 5
+    config = compact(generate_config(models=models, datasets=args.items - models))
+    build_ms, index = ms(lambda: SearchIndex.from_config(config))
+    print(f"{args.items} items, index built in {build_ms:.0f} ms")
+
+    print(f"{'query':>20} {'matches':>8} {'search ms':>10} {'facets ms':>10} {'total ms':>9}")
+    worst = 0.0
+    for query in args.queries.split(','):
+        best = None
+        for _ in range(args.repeat):
+            index._last = None  # time a fresh query, not the remembered one
+            search_ms, (total, _) = ms(lambda: index.search(query))
+            facets_ms, _ = ms(lambda: index.facets(query))
+            if best is None or search_ms + facets_ms < sum(best):
+                best = (search_ms, facets_ms)
+        worst = max(worst, sum(best))
+        print(f"{query:>20} {total:>8} {best[0]:>10.2f} {best[1]:>10.2f} {sum(best):>9.2f}")
+    print(f"slowest query (search + facets): {worst:.1f} ms")
+
+if __name__ == '__main__':
+    main()
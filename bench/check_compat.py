@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Compatibility checks against the original tools' behaviour
+
+The storage, journal and in-memory changes must not change what users
+see. Each check runs against a small config in a temporary directory and
+compares the result with what the original code produced. Exits with
+status 1 if any check fails.
+
+Usage:
+    python bench/check_compat.py
+"""
+
+import copy
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ["HF_SITE_NO_DAEMON"] = "1"
+
+import builder  # noqa: E402
+
+CHECKS = []
+
+def check(fn):
+    CHECKS.append(fn)
+    return fn
+
+# Same shape as the shipped config.json, but independent of edits to it
+FIXTURE_CONFIG = {
+    "site": {
+        "title": "My AI Model Hub",
+        "description": "Explore my collection of AI models and datasets",
+        "author": "Your Name",
+        "theme_color": "#4F46E5",
+        "header_image": None,
+        "social_links": {"github": "", "twitter": "", "linkedin": ""},
+    },
+    "categories": [
+        {"id": "nlp", "name": "Natural Language Processing", "icon": "💬", "description": "Models for text understanding and generation"},
+        {"id": "vision", "name": "Computer Vision", "icon": "👁️", "description": "Image and video processing models"},
+        {"id": "audio", "name": "Audio Processing", "icon": "🎵", "description": "Speech and sound analysis models"},
+        {"id": "datasets", "name": "Datasets", "icon": "📊", "description": "Curated datasets for training and evaluation"},
+    ],
+    "models": [
+        {
+            "name": "Example Text Classifier", "repo": "username/model-name", "category": "nlp",
+            "description": "A fine-tuned model for text classification",
+            "tags": ["classification", "bert", "nlp"], "demo_url": None, "paper_url": None,
+        },
+    ],
+    "datasets": [
+        {
+            "name": "Example Dataset", "repo": "username/dataset-name", "category": "datasets",
+            "description": "A curated dataset for specific tasks",
+            "tags": ["text", "classification"], "size": "100K samples",
+        },
+    ],
+}
+
+def stock_config() -> dict:
+    return copy.deepcopy(FIXTURE_CONFIG)
+
+def run_builder(config_file: Path, *argv) -> str:
+    saved = builder.CONFIG_FILE
+    builder.CONFIG_FILE = config_file
+    try:
+        code, out, err = builder.run_command(builder.build_parser(), [str(arg) for arg in argv])
+    finally:
+        builder.CONFIG_FILE = saved
+    if code:
+        raise AssertionError(f"builder.py {' '.join(map(str, argv))} exited {code}: {out}{err}")
+    return out
+
+def baseline_list(config: dict) -> str:
+    """`builder.py list` output, as the original list_items printed it"""
+    lines = [
+        "\n🏠 Site Information:",
+        f"  Title: {config['site']['title']}",
+        f"  Author: {config['site']['author']}",
+        f"  Description: {config['site']['description']}",
+        "\n📂 Categories:",
+    ]
+    lines += [f"  {cat['icon']} {cat['name']} ({cat['id']})" for cat in config['categories']]
+    lines.append(f"\n🤖 Models ({len(config.get('models', []))}):")
+    lines += [f"  - {m['name']} [{m['category']}]" for m in config.get('models', [])]
+    lines.append(f"\n📊 Datasets ({len(config.get('datasets', []))}): ")
+    lines += [f"  - {d['name']} [{d['category']}]" for d in config.get('datasets', [])]
+    return "\n".join(lines) + "\n"
+
+@check
+def list_text_matches_baseline(tmp: Path):
+    config = stock_config()
+    config['models'].append({**config['models'][0], "name": "Second Model", "repo": "username/second"})
+    assert len(config['models']) == 2 and len(config['datasets']) == 1
+    config_file = tmp / "config.json"
+    config_file.write_text(json.dumps(config, indent=2, ensure_ascii=False), encoding='utf-8')
+    out = run_builder(config_file, "list")
+    assert out == baseline_list(config), f"list output differs:\n{out}"
+
+@check
+def filtered_list_headings_have_no_totals(tmp: Path):
+    config_file = tmp / "config.json"
+    config_file.write_text(json.dumps(stock_config(), indent=2, ensure_ascii=False), encoding='utf-8')
+    out = run_builder(config_file, "list", "--tag", "no-such-tag")
+    assert "\n🤖 Models:\n" in out and " - " not in out, f"filtered list output:\n{out}"
+
+@check
+def journal_not_replayed_after_compaction_crash(tmp: Path):
+    from storage import open_storage
+    config_file = tmp / "config.json"
+    config_file.write_text(json.dumps(stock_config(), indent=2, ensure_ascii=False), encoding='utf-8')
+    model = open_storage(config_file).load()['models'][0]
+    open_storage(config_file).apply([
+        {"op": "update", "type": "model", "name": model['name'], "item": {**model, "name": "Renamed"}},
+        {"op": "add", "type": "model", "item": model},
+    ])
+    expected = [m['name'] for m in open_storage(config_file).load()['models']]
+    # Compaction writes the snapshot, then "crashes" before emptying the journal
+    storage = open_storage(config_file)
+    storage.journal.clear = lambda: None
+    storage.save(storage.load())
+    names = [m['name'] for m in open_storage(config_file).load()['models']]
+    assert names == expected, f"models after the crash: {names}, expected {expected}"
+
+@check
+def journal_survives_torn_last_line(tmp: Path):
+    from journal import journal_path
+    config_file = tmp / "config.json"
+    config_file.write_text(json.dumps(stock_config(), indent=2, ensure_ascii=False), encoding='utf-8')
+    run_builder(config_file, "add-model", "First", "username/first", "nlp")
+    # A crash in the middle of the next append
+    with open(journal_path(config_file), 'ab') as f:
+        f.write(b'{"op":"add","type":"model","item":{"name":"Torn"')
+    run_builder(config_file, "add-model", "Second", "username/second", "nlp")
+    run_builder(config_file, "add-model", "Third", "username/third", "nlp")
+    out = run_builder(config_file, "list")
+    for name in ("First", "Second", "Third"):
+        assert f"  - {name} [nlp]" in out, f"{name} missing after a torn journal line:\n{out}"
+    assert "Torn" not in out
+    run_builder(config_file, "compact")
+
+@check
+def repeated_migrations_replace_backups(tmp: Path):
+    config_file = tmp / "config.json"
+    config_file.write_text(json.dumps(stock_config(), indent=2, ensure_ascii=False), encoding='utf-8')
+    for layout in ("sharded", "json", "sharded", "json"):
+        run_builder(config_file, "migrate", "--to", layout)
+    assert (tmp / "config.d.bak" / "manifest.json").exists() and not (tmp / "config.d").exists()
+
+@check
+def failed_sqlite_migration_leaves_no_database(tmp: Path):
+    import storage
+    config_file = tmp / "config.json"
+    config_file.write_text(json.dumps(stock_config(), indent=2, ensure_ascii=False), encoding='utf-8')
+    save = storage.SqliteStorage.save
+
+    def failing_save(self, config):
+        save(self, config)
+        raise OSError("simulated failure after writing config.db")
+
+    storage.SqliteStorage.save = failing_save
+    try:
+        storage.migrate(config_file, "sqlite")
+    except OSError:
+        pass
+    else:
+        raise AssertionError("the simulated failure was not raised")
+    finally:
+        storage.SqliteStorage.save = save
+    assert not (tmp / "config.db").exists(), "config.db left behind by a failed migration"
+    assert storage.open_storage(config_file).kind == "json" and config_file.exists()
+
+@check
+def sharded_round_trip_keeps_item_order(tmp: Path):
+    config = stock_config()
+    first = config['models'][0]
+    config['models'] = [
+        {**first, "name": f"Model {n}", "repo": f"username/model-{n}", "category": ("nlp", "vision", "audio")[n % 3]}
+        for n in range(6)
+    ]
+    config_file = tmp / "config.json"
+    config_file.write_text(json.dumps(config, indent=2, ensure_ascii=False), encoding='utf-8')
+    run_builder(config_file, "migrate", "--to", "sharded")
+    run_builder(config_file, "migrate", "--to", "json")
+    names = [m['name'] for m in json.loads(config_file.read_text(encoding='utf-8'))['models']]
+    assert names == [m['name'] for m in config['models']], f"models reordered: {names}"
+
+@check
+def saves_refresh_the_parse_cache(tmp: Path):
+    import parse_cache
+    config_file = tmp / "config.json"
+    config_file.write_text(json.dumps(stock_config(), indent=2, ensure_ascii=False), encoding='utf-8')
+    rows = tmp / "rows.jsonl"
+    rows.write_text('{"name": "Cached", "repo": "username/cached", "category": "nlp"}\n', encoding='utf-8')
+    run_builder(config_file, "import", "--type", "model", rows)
+    parse, parse_cache.parse = parse_cache.parse, None  # any re-parse fails
+    try:
+        data = parse_cache.load_json(config_file)
+    except TypeError:
+        raise AssertionError("the save left a stale parse cache") from None
+    finally:
+        parse_cache.parse = parse
+    assert data == json.loads(config_file.read_text(encoding='utf-8'))
+
+@check
+def item_tags_mutate_like_dict_tags(tmp: Path):
+    from catalog import compact
+    config = stock_config()
+    packed = compact(json.loads(json.dumps(config)))
+    for item in (config['models'][0], packed['models'][0]):
+        item['tags'].append("appended")
+        item['tags'] += ["added"]
+        item.get('tags').remove(item['tags'][0])
+        item['tags'].sort()
+    assert packed['models'][0] == config['models'][0], \
+        f"tags edited in place: {packed['models'][0]['tags']}, expected {config['models'][0]['tags']}"
+
+def main():
+    failed = 0
+    for fn in CHECKS:
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                fn(Path(tmp))
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {fn.__name__}: {e}")
+            else:
+                print(f"✅ {fn.__name__}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Synthetic config.json generator for benchmarks
+
+Produces a config with N categories and M models/datasets. Tags follow a
+Zipf-like distribution over a fixed vocabulary (a few tags are very common,
+most are rare) and descriptions are drawn from a word list, so the output
+resembles a real catalog. Output is deterministic for a given seed.
+
+Usage:
+    python bench/gen_config.py --categories 20 --models 8000 --datasets 2000 --out /tmp/config.json
+"""
+
+import argparse
+import json
+import random
+import sys
+
+WORDS = (
+    "model dataset fine-tuned pretrained text image audio speech vision language "
+    "classification detection segmentation generation translation summarization "
+    "embedding retrieval question answering sentiment transformer diffusion lora "
+    "quantized multilingual instruction chat code math reasoning benchmark corpus "
+    "small large base tiny efficient robust open curated synthetic annotated"
+).split()
+
+TAG_VOCABULARY = [f"tag-{i}" for i in range(2000)]
+# Zipf-like weights: tag i is drawn with probability proportional to 1/(i+1)
+TAG_WEIGHTS = [1.0 / (i + 1) for i in range(len(TAG_VOCABULARY))]
+
+ICONS = ["💬", "👁️", "🎵", "📊", "🧠", "🔬", "🧪", "🎨", "🗂️", "⚙️"]
+
+def generate_config(categories=20, models=800, datasets=200, seed=0):
+    """Return a synthetic config dict"""
+    rng = random.Random(seed)
+
+    def description():
+        return " ".join(rng.choices(WORDS, k=rng.randint(6, 20))).capitalize()
+
+    def tags():
+        return sorted(set(rng.choices(TAG_VOCABULARY, TAG_WEIGHTS, k=rng.randint(1, 6))))
+
+    category_list = [
+        {
+            "id": f"cat-{i}",
+            "name": f"Category {i}",
+            "icon": ICONS[i % len(ICONS)],
+            "description": description(),
+        }
+        for i in range(categories)
+    ]
+    # Category sizes are skewed too: low-numbered categories are larger
+    category_weights = [1.0 / (i + 1) ** 0.5 for i in range(categories)]
+    category_ids = [c["id"] for c in category_list]
+
+    def category():
+        return rng.choices(category_ids, category_weights)[0]
+
+    model_list = [
+        {
+            "name": f"Model {i}",
+            "repo": f"user{i % 997}/model-{i}",
+            "category": category(),
+            "description": description(),
+            "tags": tags(),
+            "demo_url": f"https://huggingface.co/spaces/user{i % 997}/demo-{i}" if rng.random() < 0.3 else None,
+            "paper_url": f"https://arxiv.org/abs/{2000 + i % 500}.{i:05d}" if rng.random() < 0.1 else None,
+        }
+        for i in range(models)
+    ]
+    dataset_list = [
+        {
+            "name": f"Dataset {i}",
+            "repo": f"user{i % 997}/dataset-{i}",
+            "category": category(),
+            "description": description(),
+            "tags": tags(),
+            "size": f"{rng.randint(1, 999)}K samples",
+        }
+        for i in range(datasets)
+    ]
+
+    return {
+        "site": {
+            "title": "Benchmark Hub",
+            "description": "Synthetic catalog for benchmarks",
+            "author": "bench",
+            "theme_color": "#4F46E5",
+            "header_image": None,
+            "social_links": {"github": "", "twitter": "", "linkedin": ""},
+        },
+        "categories": category_list,
+        "models": model_list,
+        "datasets": dataset_list,
+    }
+
+def write_config(path, **kwargs):
+    """Generate a config and write it like builder.py does"""
+    config = generate_config(**kwargs)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+    return config
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic config.json")
+    parser.add_argument('--categories', type=int, default=20, help='Number of categories')
+    parser.add_argument('--models', type=int, default=800, help='Number of models')
+    parser.add_argument('--datasets', type=int, default=200, help='Number of datasets')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--out', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    kwargs = dict(categories=args.categories, models=args.models, datasets=args.datasets, seed=args.seed)
+    if args.out:
+        write_config(args.out, **kwargs)
+    else:
+        json.dump(generate_config(**kwargs), sys.stdout, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
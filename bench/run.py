@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark suite for HF Site Builder
+
+Generates synthetic configs (see gen_config.py) at several sizes and times
+app.py's loading and rendering functions, build_interface and the main
+builder.py commands against them. Each benchmark runs once for wall time
+and once more under tracemalloc for peak memory. Results are printed as
+JSON (and optionally written to a file) so runs can be compared across
+commits.
+
+Usage:
+    python bench/run.py [--sizes 1000,10000,100000,1000000] [--only app.] [--out results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import app  # noqa: E402
+import builder  # noqa: E402
+from gen_config import write_config  # noqa: E402
+from journal import journal_path  # noqa: E402
+
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+
+def run_builder(*argv):
+    """Run a builder.py command in-process with its output discarded"""
+    saved_argv = sys.argv
+    sys.argv = ["builder.py", *argv]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            builder.main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = saved_argv
+
+def measure(fn, setup=None):
+    """Return (seconds, peak_bytes) for one call of `fn`
+
+    `setup` runs before each of the two calls and is not measured.
+    """
+    if setup:
+        setup()
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+def benchmarks(config_path, work_path):
+    """Yield (name, fn, setup) for every benchmark against `config_path`
+
+    Mutating builder commands run against `work_path`, restored from
+    `config_path` before every run.
+    """
+    config = app.load_config()
+    index = app.build_category_index(config)
+    first_model = config['models'][0]['name'] if config['models'] else "missing"
+
+    def restore():
+        shutil.copyfile(config_path, work_path)
+        journal_path(work_path).unlink(missing_ok=True)
+        builder.CONFIG_FILE = work_path
+
+    def use_source():
+        builder.CONFIG_FILE = config_path
+
+    def cold_cache():
+        app.card_cache.clear()
+
+    yield "app.load_config", app.load_config, None
+    yield "builder.load_config", builder.load_config, use_source
+    yield "app.create_header", lambda: app.create_header(config), None
+    yield "app.create_category_card", lambda: [app.create_category_card(c) for c in config['categories']], None
+    yield "app.create_model_card", lambda: (
+        [app.create_model_card(m, "model") for m in config['models']] +
+        [app.create_model_card(d, "dataset") for d in config['datasets']]
+    ), cold_cache
+    yield "app.build_category_index", lambda: app.build_category_index(config), None
+    yield "app.create_category_section", lambda: [
+        app.create_category_section(config, c['id'], index) for c in config['categories']
+    ], cold_cache
+    yield "app.create_all_items_section", lambda: app.create_all_items_section(config), cold_cache
+
+    try:
+        import gradio  # noqa: F401
+    except ImportError:
+        print("gradio not installed; skipping app.build_interface", file=sys.stderr)
+    else:
+        def build():
+            with contextlib.redirect_stdout(io.StringIO()):
+                app.build_interface()
+        yield "app.build_interface", build, cold_cache
+
+    yield "builder.validate", lambda: run_builder("validate"), use_source
+    yield "builder.list", lambda: run_builder("list"), use_source
+    yield "builder.add-model", lambda: run_builder(
+        "add-model", "Bench Model", "bench/model", "cat-0", "--tags", "bench"
+    ), restore
+    yield "builder.remove", lambda: run_builder("remove", "model", first_model), restore
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the HF Site Builder benchmark suite")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'Comma-separated item counts (default: {DEFAULT_SIZES})')
+    parser.add_argument('--categories', type=int, default=20, help='Categories per config')
+    parser.add_argument('--only', help='Run only benchmarks whose name starts with this prefix')
+    parser.add_argument('--out', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": [],
+    }
+
+    saved_app_config, saved_builder_config = app.CONFIG_FILE, builder.CONFIG_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            for size in (int(s) for s in args.sizes.split(',')):
+                config_path = Path(tmp) / f"config-{size}.json"
+                work_path = Path(tmp) / f"work-{size}.json"
+                models = size * 4 // 5
+                write_config(config_path, categories=args.categories, models=models, datasets=size - models)
+                app.CONFIG_FILE = config_path
+                builder.CONFIG_FILE = config_path
+
+                for name, fn, setup in benchmarks(config_path, work_path):
+                    if args.only and not name.startswith(args.only):
+                        continue
+                    seconds, peak = measure(fn, setup)
+                    result = {
+                        "benchmark": name,
+                        "items": size,
+                        "config_bytes": os.path.getsize(config_path),
+                        "seconds": round(seconds, 6),
+                        "peak_bytes": peak,
+                    }
+                    report["results"].append(result)
+                    print(f"{name:<32} {size:>9} items {seconds:>10.4f}s {peak / 2**20:>10.1f} MiB", file=sys.stderr)
+                config_path.unlink()
+        finally:
+            app.CONFIG_FILE, builder.CONFIG_FILE = saved_app_config, saved_builder_config
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding='utf-8')
+
+if __name__ == '__main__':
+    main()
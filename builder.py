@@ -3,49 +3,110 @@
 HF Site Builder - CLI tool for managing your Hugging Face Space website
 """
 
+import csv
+import fnmatch
+import itertools
 import json
 import argparse
+import io
+import os
+import signal
 import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import parse_cache
+from catalog import load_catalog
+from config_diff import changed_fields, diff_categories, diff_items
+from daemon import DEFAULT_FLUSH_INTERVAL, BuilderServer, MemoryStorage, daemon_enabled, send_request, socket_path
+from storage import LAYOUTS, dump_json, iter_config_items, migrate, open_storage, write_atomic
+from validation import RULES_VERSION, validate
 
 CONFIG_FILE = Path(__file__).parent / "config.json"
+# Where `validate --incremental` records the last clean run
+VALIDATION_STATE_NAME = ".validation_state.json"
+# Set by `serve`: commands then run against the daemon's in-memory config
+served_storage = None
 
-def load_config() -> Dict:
-    """Load the configuration file"""
-    if not CONFIG_FILE.exists():
+def config_storage():
+    """The daemon's in-memory storage when serving, else the one on disk"""
+    return served_storage if served_storage is not None else open_storage(CONFIG_FILE)
+
+def flush_served_changes():
+    """Write the daemon's queued changes before a command that reads the files"""
+    if served_storage is not None:
+        served_storage.flush()
+
+def open_config_storage():
+    """Open the config storage (config.json, config.d/ or config.db), exiting if there is none"""
+    storage = config_storage()
+    if not storage.exists():
         print(f"Error: {CONFIG_FILE} not found!")
         sys.exit(1)
+    return storage
 
-    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def load_config() -> Dict:
+    """Load the configuration (config.json, the sharded config.d/ or config.db)"""
+    return load_catalog(open_config_storage())
 
 def save_config(config: Dict):
-    """Save the configuration file"""
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
-    print(f"✅ Configuration saved to {CONFIG_FILE}")
+    """Save a full snapshot of the configuration
+
+    Saves are atomic (temp file + rename, or one SQLite transaction) and
+    empty the mutation journal, whose entries `config` already includes.
+    With the sharded layout only the shards whose content changed are
+    rewritten.
+    """
+    storage = config_storage()
+    written = storage.save(config)
+    if storage.kind == "sharded":
+        print(f"✅ Configuration saved to {storage.directory} ({len(written)} files written)")
+    else:
+        print(f"✅ Configuration saved to {storage.path}")
+
+def record_change(entry: Dict):
+    """Record one mutation without rewriting the config"""
+    record_changes(open_config_storage(), [entry])
+
+def record_changes(storage, entries: List[Dict]):
+    """Record a batch of mutations with a single write
+
+    With the file layouts the entries are appended to the journal, which is
+    folded back into the snapshot once it grows past
+    storage.JOURNAL_COMPACT_BYTES (or on `builder.py compact`); SQLite
+    applies them in place, in one transaction.
+    """
+    storage.apply(entries)
+    location = storage.journal.path if storage.journal is not None else storage.path
+    changes = "Change" if len(entries) == 1 else f"{len(entries)} changes"
+    # The daemon writes them on its next flush
+    verb = "queued for" if getattr(storage, 'queues_writes', False) else "recorded in"
+    print(f"✅ {changes} {verb} {location}")
+    if storage.needs_compaction():
+        storage.compact()
+        print(f"✅ Journal compacted into {CONFIG_FILE}")
 
 def update_site_info(args):
     """Update site information"""
-    config = load_config()
-
+    fields = {}
     if args.title:
-        config['site']['title'] = args.title
+        fields['title'] = args.title
     if args.description:
-        config['site']['description'] = args.description
+        fields['description'] = args.description
     if args.author:
-        config['site']['author'] = args.author
+        fields['author'] = args.author
     if args.theme_color:
-        config['site']['theme_color'] = args.theme_color
+        fields['theme_color'] = args.theme_color
 
-    save_config(config)
+    if fields:
+        record_change({"op": "update_site", "fields": fields})
     print("✅ Site information updated!")
 
 def add_category(args):
     """Add a new category"""
-    config = load_config()
-
     new_category = {
         "id": args.id,
         "name": args.name,
@@ -53,14 +114,11 @@ def add_category(args):
         "description": args.description or ""
     }
 
-    config['categories'].append(new_category)
-    save_config(config)
+    record_change({"op": "add", "type": "category", "item": new_category})
     print(f"✅ Category '{args.name}' added!")
 
 def add_model(args):
     """Add a new model"""
-    config = load_config()
-
     new_model = {
         "name": args.name,
         "repo": args.repo,
@@ -71,14 +129,11 @@ def add_model(args):
         "paper_url": args.paper_url
     }
 
-    config['models'].append(new_model)
-    save_config(config)
+    record_change({"op": "add", "type": "model", "item": new_model})
     print(f"✅ Model '{args.name}' added!")
 
 def add_dataset(args):
     """Add a new dataset"""
-    config = load_config()
-
     new_dataset = {
         "name": args.name,
         "repo": args.repo,
@@ -88,101 +143,746 @@ def add_dataset(args):
         "size": args.size
     }
 
-    config['datasets'].append(new_dataset)
-    save_config(config)
+    record_change({"op": "add", "type": "dataset", "item": new_dataset})
     print(f"✅ Dataset '{args.name}' added!")
 
-def list_items(args):
-    """List all items in the config"""
+# Fields of each item type, in the order add-model/add-dataset write them
+ITEM_FIELDS = {
+    'model': ("name", "repo", "category", "description", "tags", "demo_url", "paper_url"),
+    'dataset': ("name", "repo", "category", "description", "tags", "size"),
+}
+REQUIRED_FIELDS = ("name", "repo", "category")
+IMPORT_FORMATS = ('jsonl', 'csv', 'json')
+
+def build_item(item_type: str, row: Dict) -> Dict:
+    """Build a model or dataset dict from an input row
+
+    Tags may be a list or a comma-separated string; missing optional fields
+    get the same defaults add-model/add-dataset use.
+    """
+    tags = row.get('tags') or []
+    if isinstance(tags, str):
+        tags = [t.strip() for t in tags.split(',') if t.strip()]
+
+    item = {}
+    for field in ITEM_FIELDS[item_type]:
+        value = row.get(field)
+        if field == 'tags':
+            value = tags
+        elif field == 'description':
+            value = value or ""
+        elif isinstance(value, str):
+            value = value.strip() or None
+        item[field] = value
+    return item
+
+def iter_json_array(f, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Yield the elements of a top-level JSON array without loading it whole"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    after_element = False
+    after_comma = False
+    eof = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+            pos += 1
+        if pos < len(buffer):
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise ValueError("expected a JSON array")
+                pos += 1
+                started = True
+                continue
+            if char == ']':
+                if after_comma:
+                    raise ValueError("expected an element after ','")
+                # Nothing but whitespace may follow the array
+                rest = buffer[pos + 1:]
+                while rest:
+                    if rest.strip(' \t\r\n'):
+                        raise ValueError("unexpected data after the JSON array")
+                    rest = f.read(chunk_size)
+                return
+            if after_element:
+                if char != ',':
+                    raise ValueError("expected ',' between array elements")
+                pos += 1
+                after_element = False
+                after_comma = True
+                continue
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    yield element
+                    pos = end
+                    after_element = True
+                    after_comma = False
+                    continue
+
+        if eof:
+            raise ValueError("unexpected end of JSON array")
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+class InvalidRow:
+    """A row that could not be parsed, in place of its dict"""
+
+    def __init__(self, error: str):
+        self.error = error
+
+def iter_import_rows(path: Path, fmt: str) -> Iterator[Tuple[int, Dict]]:
+    """Yield (row number, row dict) pairs from a JSONL, CSV or JSON array file
+
+    A JSONL line that isn't valid JSON is yielded as an `InvalidRow`.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if fmt == 'jsonl':
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        yield line_number, InvalidRow(f"invalid JSON ({e.msg} at column {e.colno})")
+        elif fmt == 'csv':
+            # Row numbers count the header as line 1
+            for row_number, row in enumerate(csv.DictReader(f), 2):
+                yield row_number, row
+        else:
+            for index, element in enumerate(iter_json_array(f), 1):
+                yield index, element
+
+def import_items(args):
+    """Bulk-import models or datasets from a JSONL, CSV or JSON array file
+
+    Rows are streamed, validated against the existing categories and
+    de-duplicated by name and repo (against the config and earlier rows),
+    then written in a single save.
+    """
+    path = Path(args.file)
+    fmt = args.format or path.suffix.lower().lstrip('.')
+    if fmt not in IMPORT_FORMATS:
+        print(f"❌ Unknown import format '{fmt}' (use --format {{{','.join(IMPORT_FORMATS)}}})")
+        sys.exit(1)
+
+    start = time.perf_counter()
     config = load_config()
+    key = 'models' if args.type == 'model' else 'datasets'
+    items = config.setdefault(key, [])
+    category_ids = {c['id'] for c in config.get('categories', [])}
+    seen_names = {item.get('name') for item in items}
+    seen_repos = {item.get('repo') for item in items}
+
+    imported, duplicates, errors = 0, 0, []
+    try:
+        for row_number, row in iter_import_rows(path, fmt):
+            if isinstance(row, InvalidRow):
+                errors.append(f"row {row_number}: {row.error}")
+                continue
+            if not isinstance(row, dict):
+                errors.append(f"row {row_number}: expected an object")
+                continue
+            item = build_item(args.type, row)
+            missing = [field for field in REQUIRED_FIELDS if not item.get(field)]
+            if missing:
+                errors.append(f"row {row_number}: missing {', '.join(missing)}")
+                continue
+            # JSON rows can hold lists or objects, which can't be looked up below
+            not_text = [field for field in REQUIRED_FIELDS if not isinstance(item[field], str)]
+            if not_text:
+                errors.append(f"row {row_number}: {', '.join(not_text)} must be text")
+                continue
+            if item['category'] not in category_ids:
+                errors.append(f"row {row_number}: unknown category '{item['category']}'")
+                continue
+            if item['name'] in seen_names or item['repo'] in seen_repos:
+                duplicates += 1
+                continue
+            seen_names.add(item['name'])
+            seen_repos.add(item['repo'])
+            items.append(item)
+            imported += 1
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"❌ Failed to read {path}: {e}")
+        sys.exit(1)
+
+    for error in errors[:20]:
+        print(f"  - {error}")
+    if len(errors) > 20:
+        print(f"  ... and {len(errors) - 20} more")
+
+    if imported:
+        save_config(config)
+    elapsed = time.perf_counter() - start
+    rows = imported + duplicates + len(errors)
+    rate = rows / elapsed if elapsed > 0 else float('inf')
+    print(
+        f"✅ Imported {imported} {args.type}s "
+        f"({duplicates} duplicates skipped, {len(errors)} invalid rows) "
+        f"in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+    )
+
+LIST_FORMATS = ('text', 'jsonl', 'csv')
+
+def non_negative_int(value: str) -> int:
+    """argparse type for counts such as --offset and --limit"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"expected a whole number >= 0, got '{value}'")
+    return number
+LIST_CSV_FIELDS = ("type", "name", "repo", "category", "description", "tags", "demo_url", "paper_url", "size")
+
+def iter_listed_items(storage, args) -> Iterator[Tuple[str, Dict]]:
+    """Stream the ``(type, item)`` pairs selected by list's filters and paging"""
+    item_types = (args.type,) if args.type else tuple(ITEM_FIELDS)
+    items = storage.iter_items(item_types, category=args.category, tag=args.tag)
+    if args.name_glob:
+        items = (
+            (item_type, item) for item_type, item in items
+            if fnmatch.fnmatchcase(str(item.get('name', '')), args.name_glob)
+        )
+    stop = args.offset + args.limit if args.limit is not None else None
+    return itertools.islice(items, args.offset, stop)
+
+def print_items_text(storage, items: Iterator[Tuple[str, Dict]], item_types, counts: bool = True):
+    """Print the site summary, then each type's heading and its items
 
+    With `counts`, headings give each type's total; leave them out when
+    filters or paging list only some of the items.
+    """
+    site = storage.site()
     print("\n🏠 Site Information:")
-    print(f"  Title: {config['site']['title']}")
-    print(f"  Author: {config['site']['author']}")
-    print(f"  Description: {config['site']['description']}")
+    print(f"  Title: {site['title']}")
+    print(f"  Author: {site['author']}")
+    print(f"  Description: {site['description']}")
 
     print("\n📂 Categories:")
-    for cat in config['categories']:
+    for cat in storage.categories():
         print(f"  {cat['icon']} {cat['name']} ({cat['id']})")
 
-    print(f"\n🤖 Models ({len(config.get('models', []))}):")
-    for model in config.get('models', []):
-        print(f"  - {model['name']} [{model['category']}]")
+    if counts:
+        headings = {
+            'model': lambda: f"\n🤖 Models ({storage.count('model')}):",
+            'dataset': lambda: f"\n📊 Datasets ({storage.count('dataset')}): ",
+        }
+    else:
+        headings = {'model': lambda: "\n🤖 Models:", 'dataset': lambda: "\n📊 Datasets:"}
+    pending = list(item_types)
+    current = None
+    for item_type, item in items:
+        if item_type != current:
+            # Headings of types with no (remaining) matches still get printed
+            while pending and pending[0] != item_type:
+                print(headings[pending.pop(0)]())
+            if pending and pending[0] == item_type:
+                print(headings[pending.pop(0)]())
+            current = item_type
+        print(f"  - {item['name']} [{item['category']}]")
+    for item_type in pending:
+        print(headings[item_type]())
+
+def list_items(args):
+    """List the site, categories and items, optionally filtered
+
+    Items are streamed from the storage and written as they are read, so
+    ``| head`` stops the command right away.
+    """
+    storage = open_config_storage()
+    items = iter_listed_items(storage, args)
+    try:
+        if args.format == 'jsonl':
+            for item_type, item in items:
+                sys.stdout.write(json.dumps({"type": item_type, **item}, ensure_ascii=False) + "\n")
+        elif args.format == 'csv':
+            writer = csv.DictWriter(sys.stdout, LIST_CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for item_type, item in items:
+                row = {"type": item_type, **item}
+                row['tags'] = ",".join(item.get('tags') or [])
+                writer.writerow(row)
+        else:
+            filtered = args.category or args.tag or args.name_glob or args.offset or args.limit is not None
+            print_items_text(storage, items, (args.type,) if args.type else tuple(ITEM_FIELDS), counts=not filtered)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); keep Python from complaining
+        # about the pipe again when it flushes stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+def read_selector_file(path: Path) -> List[str]:
+    """Non-empty lines of a --from-file list"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    except OSError as e:
+        print(f"❌ Failed to read {path}: {e}")
+        sys.exit(1)
+
+def select_items(storage, args) -> List[Dict]:
+    """Items of `args.type` matched by every given selector
+
+    Selectors: the positional name, --from-file (one name or repo per line),
+    --tag and --category. Names and repos are looked up in sets, and the
+    storage filters by tag and category (through its indexes on SQLite),
+    so this is a single pass whatever the number of names.
+    """
+    names, repos = set(), set()
+    if args.name:
+        names.add(args.name)
+    if args.from_file:
+        lines = read_selector_file(args.from_file)
+        names.update(lines)
+        repos.update(lines)
+
+    # One positional name and nothing else: let the storage use its name index
+    only_name = args.name if args.name and not args.from_file else None
+    items = storage.iter_items((args.type,), name=only_name, category=args.category, tag=args.tag)
+    if not names:
+        return [item for _, item in items]
+    return [item for _, item in items if item.get('name') in names or item.get('repo') in repos]
+
+def has_selector(args) -> bool:
+    return any((args.name, args.from_file, args.tag, args.category))
+
+def print_selection(verb: str, item_type: str, items: List[Dict], limit: int = 20):
+    """Dry-run summary: how many items, and the first few of them"""
+    print(f"🔍 Would {verb} {len(items)} {item_type}{'s' if len(items) != 1 else ''}:")
+    for item in items[:limit]:
+        print(f"  - {item.get('name')} ({item.get('repo')}) [{item.get('category')}]")
+    if len(items) > limit:
+        print(f"  ... and {len(items) - limit} more")
+
+def category_removal_entries(storage, categories: List[Dict], reassign_to: Optional[str]) -> List[Dict]:
+    """Entries removing `categories`, exiting rather than orphaning items
+
+    With `reassign_to`, each category is merged into that one instead, so
+    its items move there.
+    """
+    if reassign_to is not None:
+        if not storage.find("category", name=reassign_to):
+            print(f"❌ Category '{reassign_to}' not found!")
+            sys.exit(1)
+        if any(c['id'] == reassign_to for c in categories):
+            print(f"❌ Can't move items to '{reassign_to}': it is being removed")
+            sys.exit(1)
+        return [{"op": "merge", "type": "category", "name": c['id'], "into": reassign_to} for c in categories]
 
-    print(f"\n📊 Datasets ({len(config.get('datasets', []))}): ")
-    for dataset in config.get('datasets', []):
-        print(f"  - {dataset['name']} [{dataset['category']}]")
+    counts = storage.category_counts()
+    in_use = {c['id']: counts[c['id']] for c in categories if counts.get(c['id'])}
+    if in_use:
+        for category_id, count in in_use.items():
+            print(f"❌ Category '{category_id}' still has {count} item{'s' if count != 1 else ''}")
+        print("   Use --reassign-to ID to move them, or remove them first "
+              "(remove model --category ID, remove dataset --category ID)")
+        sys.exit(1)
+    return [{"op": "remove", "type": "category", "name": c['id']} for c in categories]
 
 def remove_item(args):
-    """Remove a model or dataset"""
+    """Remove models, datasets or categories
+
+    A single name works as before; --from-file, --tag and --category select
+    many items, which are removed with one write.
+    """
+    if not has_selector(args):
+        print("❌ Give a name, --from-file, --tag or --category")
+        sys.exit(1)
+
+    label = args.type.capitalize()
+    storage = open_config_storage()
+    if args.reassign_to is not None and args.type != "category":
+        print("❌ --reassign-to only applies to categories")
+        sys.exit(1)
+
+    if args.type == "category":
+        if args.tag or args.category:
+            print("❌ Categories can only be removed by ID (name or --from-file)")
+            sys.exit(1)
+        ids = set(read_selector_file(args.from_file)) if args.from_file else set()
+        if args.name:
+            ids.add(args.name)
+        matched = [c for c in storage.categories() if c.get('id') in ids]
+        entries = category_removal_entries(storage, matched, args.reassign_to)
+    else:
+        matched = select_items(storage, args)
+        entries = [
+            {"op": "remove", "type": args.type, "name": item.get('name'), "repo": item.get('repo')}
+            for item in matched
+        ]
+
+    single = args.name if not (args.from_file or args.tag or args.category) else None
+    if not matched:
+        print(f"❌ {label} '{single}' not found!" if single else f"❌ No matching {args.type} found!")
+        return
+    if args.dry_run:
+        print_selection("remove", args.type, matched)
+        return
+
+    record_changes(storage, entries)
+    if single:
+        print(f"✅ {label} '{single}' removed!")
+    else:
+        print(f"✅ Removed {len(matched)} {args.type}{'s' if len(matched) != 1 else ''}")
+
+def rename_category(args):
+    """Change a category's ID, and every item that references it, with one write"""
+    storage = open_config_storage()
+    if not storage.find("category", name=args.old):
+        print(f"❌ Category '{args.old}' not found!")
+        sys.exit(1)
+    if storage.find("category", name=args.new):
+        print(f"❌ Category '{args.new}' already exists (use `category merge` to combine them)")
+        sys.exit(1)
+
+    moved = storage.category_counts().get(args.old, 0)
+    record_changes(storage, [{"op": "rename", "type": "category", "name": args.old, "to": args.new}])
+    print(f"✅ Category '{args.old}' renamed to '{args.new}' ({moved} items updated)")
+
+def merge_category(args):
+    """Move every item of one category into another and remove the first, with one write"""
+    storage = open_config_storage()
+    for category_id in (args.source, args.target):
+        if not storage.find("category", name=category_id):
+            print(f"❌ Category '{category_id}' not found!")
+            sys.exit(1)
+    if args.source == args.target:
+        print("❌ Can't merge a category into itself")
+        sys.exit(1)
+
+    moved = storage.category_counts().get(args.source, 0)
+    record_changes(storage, [{"op": "merge", "type": "category", "name": args.source, "into": args.target}])
+    print(f"✅ Merged '{args.source}' into '{args.target}' ({moved} items moved)")
+
+def parse_field_updates(item_type: str, assignments: List[str]) -> Dict:
+    """Turn --set FIELD=VALUE options into a dict of field values"""
+    fields = {}
+    for assignment in assignments:
+        field, sep, value = assignment.partition('=')
+        field = field.strip()
+        if not sep or field not in ITEM_FIELDS[item_type]:
+            print(f"❌ Invalid --set '{assignment}' (fields: {', '.join(ITEM_FIELDS[item_type])})")
+            sys.exit(1)
+        fields[field] = build_item(item_type, {field: value})[field]
+    return fields
+
+def split_tags(value: Optional[str]) -> List[str]:
+    return [t.strip() for t in value.split(',') if t.strip()] if value else []
+
+def update_items(args):
+    """Patch fields and tags on every selected model or dataset with one write"""
+    if not has_selector(args):
+        print("❌ Give a name, --from-file, --tag or --category")
+        sys.exit(1)
+    fields = parse_field_updates(args.type, args.set or [])
+    add_tags, remove_tags = split_tags(args.add_tags), set(split_tags(args.remove_tags))
+    if not (fields or add_tags or remove_tags):
+        print("❌ Nothing to update (use --set, --add-tags or --remove-tags)")
+        sys.exit(1)
+
+    storage = open_config_storage()
+    if 'category' in fields and not storage.find("category", name=fields['category']):
+        print(f"❌ Category '{fields['category']}' not found!")
+        sys.exit(1)
+    matched = select_items(storage, args)
+    if not matched:
+        print(f"❌ No matching {args.type} found!")
+        return
+    if args.dry_run:
+        print_selection("update", args.type, matched)
+        changes = [f"{field}={value!r}" for field, value in fields.items()]
+        changes += [f"+tag {t}" for t in add_tags] + [f"-tag {t}" for t in sorted(remove_tags)]
+        print(f"  changes: {', '.join(changes)}")
+        return
+
+    entries = []
+    for item in matched:
+        updated = {**item, **fields}
+        if add_tags or remove_tags:
+            old_tags = updated.get('tags') or []
+            tags = [t for t in old_tags if t not in remove_tags]
+            tags += [t for t in add_tags if t not in tags]
+            if tags != old_tags:
+                updated['tags'] = tags
+        if updated != item:
+            entries.append({
+                "op": "update", "type": args.type,
+                "name": item.get('name'), "repo": item.get('repo'), "item": updated,
+            })
+
+    if entries:
+        record_changes(storage, entries)
+    print(f"✅ Updated {len(entries)} {args.type}{'s' if len(entries) != 1 else ''} "
+          f"({len(matched) - len(entries)} already up to date)")
+
+def compact_journal(args):
+    """Fold the mutation journal into a new config snapshot"""
+    flush_served_changes()
+    storage = open_config_storage()
+    if storage.journal is None:
+        print(f"✅ {storage.kind} storage applies changes in place, nothing to compact")
+        return
+
+    entries = len(storage.pending_entries())
+    if not entries:
+        print("✅ Journal is empty, nothing to compact")
+        return
+    written = storage.compact()
+    print(f"✅ Compacted {entries} journal entries ({len(written)} files written)")
+
+def export_config(args):
+    """Write the configuration, from whichever storage holds it, as a config.json-style file"""
     config = load_config()
+    write_atomic(Path(args.file), dump_json(config))
+    items = len(config.get('models', [])) + len(config.get('datasets', []))
+    print(f"✅ Exported {items} items to {args.file}")
 
-    if args.type == "model":
-        original_count = len(config.get('models', []))
-        config['models'] = [m for m in config.get('models', []) if m['name'] != args.name]
-        if len(config['models']) < original_count:
-            save_config(config)
-            print(f"✅ Model '{args.name}' removed!")
-        else:
-            print(f"❌ Model '{args.name}' not found!")
-
-    elif args.type == "dataset":
-        original_count = len(config.get('datasets', []))
-        config['datasets'] = [d for d in config.get('datasets', []) if d['name'] != args.name]
-        if len(config['datasets']) < original_count:
-            save_config(config)
-            print(f"✅ Dataset '{args.name}' removed!")
-        else:
-            print(f"❌ Dataset '{args.name}' not found!")
-
-    elif args.type == "category":
-        original_count = len(config['categories'])
-        config['categories'] = [c for c in config['categories'] if c['id'] != args.name]
-        if len(config['categories']) < original_count:
-            save_config(config)
-            print(f"✅ Category '{args.name}' removed!")
-        else:
-            print(f"❌ Category '{args.name}' not found!")
+def read_config_file(path: Path) -> Dict:
+    """A config.json-style file, exiting if it can't be read"""
+    try:
+        config = parse_cache.parse(path.read_bytes())
+    except (OSError, ValueError) as e:
+        print(f"❌ Failed to read {path}: {e}")
+        sys.exit(1)
+    if not isinstance(config, dict) or not {'site', 'categories'} <= config.keys():
+        print(f"❌ {path} is not a site configuration (needs 'site' and 'categories')")
+        sys.exit(1)
+    return config
 
-def validate_config(args):
-    """Validate the configuration file"""
+def import_config(args):
+    """Replace the configuration with a config.json-style file"""
+    path = Path(args.file)
+    config = read_config_file(path)
+    config.setdefault('models', [])
+    config.setdefault('datasets', [])
+    save_config(config)
+    items = len(config['models']) + len(config['datasets'])
+    print(f"✅ Imported {items} items from {path}")
+
+def diff_configs(args):
+    """Show the site fields, categories and items that differ between two configs
+
+    Items are matched by type, name and repo (see config_diff.py), so this
+    is one pass over each file whatever the order of their lists.
+    """
+    old, new = read_config_file(Path(args.old)), read_config_file(Path(args.new))
+    # The index dicts hold no cycles; GC passes over them would cost more than the diff
+    with parse_cache.gc_paused():
+        site_fields = changed_fields(old.get('site', {}), new.get('site', {}))
+        categories_added, categories_removed, categories_modified = diff_categories(old, new)
+        added, removed, modified = diff_items(old, new)
+
+    if args.json:
+        print(json.dumps({
+            "site": site_fields,
+            "categories": {
+                "added": [c.get('id') for c in categories_added],
+                "removed": [c.get('id') for c in categories_removed],
+                "modified": [{"id": n.get('id'), "fields": changed_fields(o, n)} for o, n in categories_modified],
+            },
+            "added": [{"type": t, "name": i.get('name'), "repo": i.get('repo')} for t, i in added],
+            "removed": [{"type": t, "name": i.get('name'), "repo": i.get('repo')} for t, i in removed],
+            "modified": [
+                {"type": t, "name": n.get('name'), "repo": n.get('repo'), "fields": changed_fields(o, n)}
+                for t, o, n in modified
+            ],
+        }, indent=2, ensure_ascii=False))
+        return
+
+    if site_fields:
+        print(f"~ site: {', '.join(site_fields)}")
+    for category in categories_added:
+        print(f"+ category {category.get('id')}")
+    for category in categories_removed:
+        print(f"- category {category.get('id')}")
+    for old_category, new_category in categories_modified:
+        print(f"~ category {new_category.get('id')}: {', '.join(changed_fields(old_category, new_category))}")
+    for item_type, item in added:
+        print(f"+ {item_type} {item.get('name')} ({item.get('repo')})")
+    for item_type, item in removed:
+        print(f"- {item_type} {item.get('name')} ({item.get('repo')})")
+    for item_type, old_item, new_item in modified:
+        print(f"~ {item_type} {new_item.get('name')} ({new_item.get('repo')}): {', '.join(changed_fields(old_item, new_item))}")
+
+    if not (site_fields or categories_added or categories_removed or categories_modified or added or removed or modified):
+        print("✅ No differences")
+    else:
+        print(f"✅ {len(added)} items added, {len(removed)} removed, {len(modified)} modified")
+
+def migrate_storage(args):
+    """Convert between config.json, the sharded config.d/ and config.db"""
+    flush_served_changes()
     try:
-        config = load_config()
+        written = migrate(CONFIG_FILE, args.to)
+    except (OSError, ValueError) as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+    if served_storage is not None:
+        served_storage.reopen(open_storage(CONFIG_FILE))
+    print(f"✅ Migrated configuration to {args.to} layout ({len(written)} files written)")
+
+def snapshot_signature(storage) -> List[int]:
+    stat = storage.watch_path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
 
-        errors = []
+def journaled_changes(storage, state: Dict) -> Optional[List[Tuple[str, Dict]]]:
+    """Items added or updated since the last clean `validate --incremental`
 
-        # Check required fields
-        if 'site' not in config:
-            errors.append("Missing 'site' section")
-        if 'categories' not in config:
-            errors.append("Missing 'categories' section")
+    Returns None when a full run is needed: no usable state, a snapshot
+    rewritten since (e.g. by compaction), or a removed, renamed or merged
+    category.
+    """
+    if storage.journal is None or state.get('rules') != RULES_VERSION:
+        return None
+    if state.get('snapshot') != snapshot_signature(storage) or storage.journal.size() < state.get('journal_bytes', 0):
+        return None
 
-        # Check category IDs
-        category_ids = [c['id'] for c in config.get('categories', [])]
+    changed, removed = [], False
+    for entry in storage.journal.entries(state.get('journal_bytes', 0)):
+        if entry.get('type') == 'category' and entry.get('op') != 'add':
+            return None
+        if entry.get('op') in ('add', 'update') and entry.get('type') in ITEM_FIELDS:
+            changed.append((entry['type'], entry['item']))
+        removed = removed or entry.get('op') in ('remove', 'update')
+    if removed and changed:
+        # Drop items a later entry removed or replaced
+        config = storage.load()
+        present = {
+            (item_type, item.get('name'), item.get('repo'))
+            for item_type, item in iter_config_items(config)
+        }
+        changed = [(t, item) for t, item in changed if (t, item.get('name'), item.get('repo')) in present]
+    return changed
+
+def validate_config(args):
+    """Validate the configuration (see validation.py for the rules)
+
+    With --incremental and a journaled layout, only items added or updated
+    since the last clean incremental run are checked.
+    """
+    if args.incremental:
+        # The recorded state points into the journal on disk
+        flush_served_changes()
+    storage = open_config_storage()
+    try:
+        config = load_catalog(storage)
+    except json.JSONDecodeError as e:
+        print(f"❌ Invalid JSON: {e}")
+        sys.exit(1)
 
-        # Validate models
-        for model in config.get('models', []):
-            if model.get('category') not in category_ids:
-                errors.append(f"Model '{model.get('name')}' has invalid category: {model.get('category')}")
+    state_path = CONFIG_FILE.with_name(VALIDATION_STATE_NAME)
+    changed = None
+    if args.incremental and state_path.exists():
+        try:
+            changed = journaled_changes(storage, json.loads(state_path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            changed = None
 
-        # Validate datasets
-        for dataset in config.get('datasets', []):
-            if dataset.get('category') not in category_ids:
-                errors.append(f"Dataset '{dataset.get('name')}' has invalid category: {dataset.get('category')}")
+    report = validate(config, changed)
+    data = report.to_dict()
+    data['incremental'] = changed is not None
+    if args.report:
+        write_atomic(Path(args.report), json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+    if args.incremental and report.ok and storage.journal is not None:
+        # Record what was validated; the next incremental run starts here
+        write_atomic(state_path, json.dumps({
+            "rules": RULES_VERSION,
+            "snapshot": snapshot_signature(storage),
+            "journal_bytes": storage.journal.size(),
+        }))
 
-        if errors:
+    if args.json:
+        print(json.dumps(data, indent=2, ensure_ascii=False))
+    else:
+        for warning in report.warnings:
+            print(f"⚠️ {warning.message}")
+        if report.errors:
             print("❌ Configuration validation failed:")
-            for error in errors:
-                print(f"  - {error}")
-            sys.exit(1)
+            for error in report.errors:
+                print(f"  - {error.message}")
         else:
             print("✅ Configuration is valid!")
+        stats = data['stats']
+        print(f"   {stats['checked']} of {stats['items']} items checked in {data['timings']['total']:.3f}s")
+    if not report.ok:
+        sys.exit(1)
 
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON: {e}")
+def run_command(parser, argv: List[str]) -> Tuple[int, str, str]:
+    """Run one command in this process; returns (exit code, stdout, stderr)"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            dispatch(parser, argv)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    return code, stdout.getvalue(), stderr.getvalue()
+
+def serve(args):
+    """Hold the config in memory and run commands sent over the socket
+
+    Edits are written in batches every --flush-interval seconds; see
+    daemon.py for the protocol.
+    """
+    global served_storage
+    path = socket_path(CONFIG_FILE)
+    if served_storage is not None:
+        print("❌ Already running as the daemon")
         sys.exit(1)
+    if args.stop or args.flush:
+        response = send_request(path, {"control": "stop" if args.stop else "flush"})
+        if response is None:
+            print(f"❌ No daemon is listening on {path}")
+            sys.exit(1)
+        print(response['stdout'], end='')
+        if args.stop:
+            print("✅ Daemon stopped")
+        return
 
-def main():
+    storage = MemoryStorage(open_config_storage())
+    parser = build_parser()
+    try:
+        server = BuilderServer(path, storage, lambda argv: run_command(parser, argv), args.flush_interval)
+    except OSError as e:
+        print(f"❌ Cannot listen on {path}: {e}")
+        sys.exit(1)
+    served_storage = storage
+    # Flush and remove the socket on `kill` too
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    items = storage.count('model') + storage.count('dataset')
+    print(f"✅ Serving {items} items from {storage.kind} storage on {path} "
+          f"(writes every {args.flush_interval}s)", flush=True)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        served_storage = None
+    print("✅ Daemon stopped, all changes written")
+
+def add_selector_arguments(parser):
+    """Options shared by remove and update for selecting many items"""
+    parser.add_argument('--from-file', help='File with one name, repo (or category ID) per line')
+    parser.add_argument('--tag', help='Only items with this tag')
+    parser.add_argument('--category', help='Only items in this category ID')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would change without writing')
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="HF Site Builder - Manage your Hugging Face Space website",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -228,20 +928,96 @@ def main():
     dataset_parser.set_defaults(func=add_dataset)
 
     # List items
-    list_parser = subparsers.add_parser('list', help='List all items')
+    list_parser = subparsers.add_parser('list', help='List items (all, or filtered)')
+    list_parser.add_argument('--type', choices=['model', 'dataset'], help='Only this item type')
+    list_parser.add_argument('--category', help='Only items in this category ID')
+    list_parser.add_argument('--tag', help='Only items with this tag')
+    list_parser.add_argument('--name-glob', help="Only items whose name matches this glob (e.g. 'Llama*')")
+    list_parser.add_argument('--offset', type=non_negative_int, default=0, help='Skip this many matching items')
+    list_parser.add_argument('--limit', type=non_negative_int, help='List at most this many items')
+    list_parser.add_argument('--format', choices=LIST_FORMATS, default='text', help='Output format (default: text)')
     list_parser.set_defaults(func=list_items)
 
     # Remove item
-    remove_parser = subparsers.add_parser('remove', help='Remove an item')
+    remove_parser = subparsers.add_parser('remove', help='Remove items')
     remove_parser.add_argument('type', choices=['model', 'dataset', 'category'], help='Item type')
-    remove_parser.add_argument('name', help='Item name or ID')
+    remove_parser.add_argument('name', nargs='?', help='Item name or ID')
+    add_selector_arguments(remove_parser)
+    remove_parser.add_argument('--reassign-to', metavar='ID', help="Move a removed category's items to this category")
     remove_parser.set_defaults(func=remove_item)
 
+    # Category rename/merge
+    category_parser = subparsers.add_parser('category', help='Rename or merge categories')
+    category_subparsers = category_parser.add_subparsers(dest='category_command', required=True)
+    rename_parser = category_subparsers.add_parser('rename', help="Change a category's ID (its items follow)")
+    rename_parser.add_argument('old', help='Current category ID')
+    rename_parser.add_argument('new', help='New category ID')
+    rename_parser.set_defaults(func=rename_category)
+    merge_parser = category_subparsers.add_parser('merge', help='Move all items of one category into another and remove it')
+    merge_parser.add_argument('source', help='Category ID to merge (removed afterwards)')
+    merge_parser.add_argument('target', help='Category ID to merge into')
+    merge_parser.set_defaults(func=merge_category)
+
+    # Batch update
+    update_parser = subparsers.add_parser('update', help='Patch fields on one or many items')
+    update_parser.add_argument('type', choices=['model', 'dataset'], help='Item type')
+    update_parser.add_argument('name', nargs='?', help='Item name')
+    add_selector_arguments(update_parser)
+    update_parser.add_argument('--set', action='append', metavar='FIELD=VALUE', help='Set a field (repeatable; tags are comma-separated)')
+    update_parser.add_argument('--add-tags', help='Comma-separated tags to add')
+    update_parser.add_argument('--remove-tags', help='Comma-separated tags to remove')
+    update_parser.set_defaults(func=update_items)
+
+    # Bulk import
+    import_parser = subparsers.add_parser('import', help='Bulk-import models or datasets from a file')
+    import_parser.add_argument('file', help='Input file (.jsonl, .csv or .json array)')
+    import_parser.add_argument('--type', choices=['model', 'dataset'], required=True, help='Item type')
+    import_parser.add_argument('--format', choices=IMPORT_FORMATS, help='Input format (default: from file extension)')
+    import_parser.set_defaults(func=import_items)
+
+    # Storage layout migration
+    migrate_parser = subparsers.add_parser('migrate', help='Convert between config.json, the sharded config.d/ and SQLite config.db')
+    migrate_parser.add_argument('--to', choices=LAYOUTS, required=True, help='Target layout')
+    migrate_parser.set_defaults(func=migrate_storage)
+
+    # config.json-schema export/import
+    export_parser = subparsers.add_parser('export-config', help='Write the configuration as a config.json-style file')
+    export_parser.add_argument('file', help='Output file (e.g. config.json to deploy JSON from a SQLite config)')
+    export_parser.set_defaults(func=export_config)
+
+    import_config_parser = subparsers.add_parser('import-config', help='Replace the configuration with a config.json-style file')
+    import_config_parser.add_argument('file', help='Input file')
+    import_config_parser.set_defaults(func=import_config)
+
+    # Structural diff
+    diff_parser = subparsers.add_parser('diff', help='Show what changed between two config.json-style files')
+    diff_parser.add_argument('old', help='Old config file')
+    diff_parser.add_argument('new', help='New config file')
+    diff_parser.add_argument('--json', action='store_true', help='Print the differences as JSON')
+    diff_parser.set_defaults(func=diff_configs)
+
+    # Fold the journal into the snapshot
+    compact_parser = subparsers.add_parser('compact', help='Fold the mutation journal into the config snapshot')
+    compact_parser.set_defaults(func=compact_journal)
+
     # Validate config
     validate_parser = subparsers.add_parser('validate', help='Validate configuration')
+    validate_parser.add_argument('--incremental', action='store_true', help='Only check items changed since the last clean incremental run')
+    validate_parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    validate_parser.add_argument('--report', help='Also write the JSON report to this file')
     validate_parser.set_defaults(func=validate_config)
 
-    args = parser.parse_args()
+    # Daemon
+    serve_parser = subparsers.add_parser('serve', help='Keep the config in memory and serve commands over a Unix socket')
+    serve_parser.add_argument('--flush-interval', type=float, default=DEFAULT_FLUSH_INTERVAL, help='Seconds between batched writes (default: %(default)s)')
+    serve_parser.add_argument('--stop', action='store_true', help='Ask the running daemon to write pending changes and exit')
+    serve_parser.add_argument('--flush', action='store_true', help='Ask the running daemon to write pending changes now')
+    serve_parser.set_defaults(func=serve)
+
+    return parser
+
+def dispatch(parser, argv: List[str]):
+    args = parser.parse_args(argv)
 
     if args.command is None:
         parser.print_help()
@@ -249,5 +1025,17 @@ def main():
 
     args.func(args)
 
+def main():
+    argv = sys.argv[1:]
+    # With a daemon running, let it run the command against its in-memory config
+    if argv[:1] != ['serve'] and daemon_enabled():
+        response = send_request(socket_path(CONFIG_FILE), {"argv": argv, "cwd": os.getcwd()})
+        if response is not None:
+            sys.stdout.write(response['stdout'])
+            sys.stderr.write(response['stderr'])
+            sys.exit(response['exit'])
+
+    dispatch(build_parser(), argv)
+
 if __name__ == '__main__':
     main()
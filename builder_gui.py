@@ -4,12 +4,193 @@ HF Site Builder - GUI tool for managing your Hugging Face Space website
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, simpledialog
 import json
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
+
+from catalog import Item, load_catalog, to_json
+from item_filter import ItemFilter
+from journal import replay
+from storage import count_categories, open_storage
+from validation import validate
 
 CONFIG_FILE = Path(__file__).parent / "config.json"
+# Longest list of validation messages shown in one dialog
+VALIDATION_MESSAGES_SHOWN = 50
+
+def category_label(category: Dict) -> str:
+    return f"{category['icon']} {category['name']} ({category['id']})"
+
+class ItemTable:
+    """Filterable, sortable table of models or datasets
+
+    Virtualized: the Treeview only ever holds the rows in view, refilled
+    from the `ItemFilter` view on every scroll, so a 100k-item list costs
+    what a screenful does. Typing in the filter box narrows the list by
+    name and tag prefixes (``tag:<name>`` for an exact tag); clicking a
+    heading sorts by that column, clicking again reverses it.
+    """
+    COLUMNS = (("name", "Name", 200), ("category", "Category", 100), ("repo", "Repo", 180))
+
+    def __init__(self, parent, items: List[Dict]):
+        self.filter = ItemFilter(items)
+        self.view = self.filter.ids
+        self.sort_column, self.reverse = None, False
+        self.top = 0          # position in the view of the first row shown
+        self.visible_rows = 15
+        self.selected = None  # ItemFilter id of the selected item
+
+        filter_frame = ttk.Frame(parent)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        self.query = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.query).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.count_label = ttk.Label(filter_frame)
+        self.count_label.pack(side=tk.LEFT)
+        self.query.trace_add("write", lambda *args: self.refilter())
+
+        table_frame = ttk.Frame(parent)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(
+            table_frame, columns=[column for column, _, _ in self.COLUMNS],
+            show="headings", height=self.visible_rows, selectmode="browse"
+        )
+        for column, title, width in self.COLUMNS:
+            self.tree.heading(column, text=title, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, stretch=True)
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.yview)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<Configure>", self.on_resize)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+        for sequence, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page")):
+            self.tree.bind(sequence, lambda e, s=step: self.move_selection(s))
+
+        # Build the filter index once the window is up, not on the first keystroke
+        parent.after_idle(self.filter.prepare)
+        self.render()
+
+    # Model
+    def reset(self, items: List[Dict]):
+        """Show a new list (e.g. after a reload)"""
+        self.filter.reset(items)
+        self.selected = None
+        self.refilter()
+
+    def append(self, item: Dict):
+        """An item was appended to the list"""
+        self.filter.add(item)
+        self.refilter(keep_position=True)
+
+    def remove(self, index: int):
+        """The item at `index` of the list was deleted"""
+        self.filter.remove(index)
+        if self.selected_index() is None:
+            self.selected = None
+        self.refilter(keep_position=True)
+
+    def changed(self):
+        """Items were edited in place"""
+        self.filter.changed()
+        self.refilter(keep_position=True)
+
+    def selected_index(self) -> Optional[int]:
+        """Position in the list of the selected item"""
+        return None if self.selected is None else self.filter.index_of(self.selected)
+
+    def refilter(self, keep_position=False):
+        """Recompute the view; a new filter or sort starts from the top"""
+        self.view = self.filter.view(self.query.get(), self.sort_column, self.reverse)
+        if not keep_position:
+            self.top = 0
+        self.render()
+
+    def sort_by(self, column: str):
+        if self.sort_column == column:
+            self.reverse = not self.reverse
+        else:
+            self.sort_column, self.reverse = column, False
+        for name, title, _ in self.COLUMNS:
+            arrow = (" ▼" if self.reverse else " ▲") if name == column else ""
+            self.tree.heading(name, text=title + arrow)
+        self.refilter()
+
+    # View
+    def render(self):
+        """Fill the Treeview with the rows from `top`"""
+        total = len(self.view)
+        self.top = max(0, min(self.top, total - self.visible_rows))
+        window = self.view[self.top:self.top + self.visible_rows]
+        self.tree.delete(*self.tree.get_children())
+        for item_id in window:
+            item = self.filter.item(item_id)
+            self.tree.insert("", tk.END, iid=str(item_id), values=(
+                item.get('name') or "", item.get('category') or "N/A", item.get('repo') or ""
+            ))
+        if self.selected in window:
+            self.tree.selection_set(str(self.selected))
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + len(window)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        shown = f"{total} of {len(self.filter)}" if total != len(self.filter) else f"{total}"
+        self.count_label.configure(text=shown)
+
+    def scroll_to(self, top: int):
+        self.top = top
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar command: ``moveto fraction`` or ``scroll n units|pages``"""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.view)))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_to(self.top - 3)
+        else:
+            self.scroll_to(self.top + 3)
+        return "break"
+
+    def on_resize(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # Less the heading
+        rows = max(1, (event.height - row_height - 4) // row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        # Refilling the rows clears the Treeview's selection, not ours
+        if selection:
+            self.selected = int(selection[0])
+
+    def move_selection(self, step):
+        """Arrow and page keys: move through the whole view, not just the rows shown"""
+        if not self.view:
+            return "break"
+        if step in ("page", "-page"):
+            step = self.visible_rows if step == "page" else -self.visible_rows
+        try:
+            position = self.view.index(self.selected) + step
+        except ValueError:
+            position = self.top
+        position = max(0, min(position, len(self.view) - 1))
+        self.selected = self.view[position]
+        if position < self.top:
+            self.top = position
+        elif position >= self.top + self.visible_rows:
+            self.top = position - self.visible_rows + 1
+        self.render()
+        return "break"
 
 class HFSiteBuilderGUI:
     def __init__(self, root):
@@ -52,6 +233,8 @@ class HFSiteBuilderGUI:
         self.create_models_tab()
         self.create_datasets_tab()
         self.create_preview_tab()
+        # The preview is a dump of the whole config: only redo it when shown
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.refresh_preview_if_stale())
 
         # Footer buttons
         self.create_footer(main_frame)
@@ -212,9 +395,7 @@ class HFSiteBuilderGUI:
         tab.rowconfigure(0, weight=1)
 
         # Models list
-        self.models_listbox = tk.Listbox(list_frame, height=15)
-        self.models_listbox.pack(fill=tk.BOTH, expand=True)
-        self.refresh_models_list()
+        self.models_table = ItemTable(list_frame, self.config.setdefault('models', []))
 
         # Delete button
         delete_btn = ttk.Button(
@@ -300,9 +481,7 @@ class HFSiteBuilderGUI:
         tab.rowconfigure(0, weight=1)
 
         # Datasets list
-        self.datasets_listbox = tk.Listbox(list_frame, height=15)
-        self.datasets_listbox.pack(fill=tk.BOTH, expand=True)
-        self.refresh_datasets_list()
+        self.datasets_table = ItemTable(list_frame, self.config.setdefault('datasets', []))
 
         # Delete button
         delete_btn = ttk.Button(
@@ -368,6 +547,8 @@ class HFSiteBuilderGUI:
             font=('Courier', 9)
         )
         self.preview_text.pack(fill=tk.BOTH, expand=True)
+        self.preview_tab = tab
+        self.preview_stale = True
 
         # Refresh button
         refresh_btn = ttk.Button(
@@ -377,8 +558,6 @@ class HFSiteBuilderGUI:
         )
         refresh_btn.pack(pady=10)
 
-        self.refresh_preview()
-
     def create_footer(self, parent):
         """Create footer with action buttons"""
         footer_frame = ttk.Frame(parent)
@@ -406,8 +585,7 @@ class HFSiteBuilderGUI:
     def load_config(self) -> Dict:
         """Load configuration from file"""
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_catalog(open_storage(CONFIG_FILE))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load config: {e}")
             return {"site": {}, "categories": [], "models": [], "datasets": []}
@@ -415,13 +593,41 @@ class HFSiteBuilderGUI:
     def save_config(self):
         """Save configuration to file"""
         try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            open_storage(CONFIG_FILE).save(self.config)
             messagebox.showinfo("Success", "Configuration saved successfully!")
-            self.refresh_preview()
+            self.mark_preview_stale()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save config: {e}")
+
+    def record_change(self, entry: Dict):
+        """Record one edit already made to self.config (see journal.py)
+
+        Like builder.py, small edits are journaled (or applied in place in
+        SQLite) instead of rewriting the whole config.
+        """
+        try:
+            storage = open_storage(CONFIG_FILE)
+            storage.append(entry)
+            if storage.needs_compaction():
+                storage.compact()
+            messagebox.showinfo("Success", "Configuration saved successfully!")
+            self.mark_preview_stale()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save config: {e}")
 
+    def remove_entry(self, item_type: str, key: str, index: int) -> Dict:
+        """Journal entry removing item `index`, or None if it has a twin
+
+        Journaled removes match by name and repo, so an exact duplicate
+        would go too; those deletions are saved in full instead.
+        """
+        item = self.config[key][index]
+        name, repo = item.get('name'), item.get('repo')
+        twins = sum(1 for other in self.config[key] if other.get('name') == name and other.get('repo') == repo)
+        if twins > 1:
+            return None
+        return {"op": "remove", "type": item_type, "name": name, "repo": repo}
+
     def reload_config(self):
         """Reload configuration from file"""
         self.config = self.load_config()
@@ -429,13 +635,15 @@ class HFSiteBuilderGUI:
         messagebox.showinfo("Success", "Configuration reloaded!")
 
     def refresh_all(self):
-        """Refresh all UI elements"""
+        """Rebuild all UI elements (after a reload; edits update only their rows)"""
         self.refresh_categories_list()
         self.refresh_models_list()
         self.refresh_datasets_list()
-        self.refresh_preview()
+        self.mark_preview_stale()
+        self.refresh_category_choices()
 
-        # Update comboboxes
+    def refresh_category_choices(self):
+        """Update the category comboboxes"""
         if hasattr(self, 'model_category'):
             self.model_category['values'] = [cat['id'] for cat in self.config['categories']]
         if hasattr(self, 'dataset_category'):
@@ -457,10 +665,7 @@ class HFSiteBuilderGUI:
         """Refresh categories listbox"""
         self.categories_listbox.delete(0, tk.END)
         for cat in self.config['categories']:
-            self.categories_listbox.insert(
-                tk.END,
-                f"{cat['icon']} {cat['name']} ({cat['id']})"
-            )
+            self.categories_listbox.insert(tk.END, category_label(cat))
 
     def add_category(self):
         """Add a new category"""
@@ -486,8 +691,9 @@ class HFSiteBuilderGUI:
         }
 
         self.config['categories'].append(new_category)
-        self.save_config()
-        self.refresh_all()
+        self.categories_listbox.insert(tk.END, category_label(new_category))
+        self.refresh_category_choices()
+        self.record_change({"op": "add", "type": "category", "item": new_category})
 
         # Clear form
         self.cat_id.delete(0, tk.END)
@@ -504,21 +710,65 @@ class HFSiteBuilderGUI:
             return
 
         index = selection[0]
-        cat_name = self.config['categories'][index]['name']
+        category = self.config['categories'][index]
+        cat_name = category['name']
+
+        in_use = count_categories(self.config).get(category['id'], 0)
+        if not in_use:
+            if messagebox.askyesno("Confirm", f"Delete category '{cat_name}'?"):
+                del self.config['categories'][index]
+                self.categories_listbox.delete(index)
+                self.refresh_category_choices()
+                self.record_change({"op": "remove", "type": "category", "name": category['id']})
+            return
 
-        if messagebox.askyesno("Confirm", f"Delete category '{cat_name}'?"):
-            del self.config['categories'][index]
-            self.save_config()
-            self.refresh_all()
+        # Don't leave items pointing at a category that no longer exists
+        choice = messagebox.askyesnocancel(
+            "Category in use",
+            f"Category '{cat_name}' still has {in_use} models/datasets.\n\n"
+            "Yes: move them to another category\n"
+            "No: delete them along with the category\n"
+            "Cancel: keep everything"
+        )
+        if choice is None:
+            return
+        # Tables showing items of this category
+        tables = {
+            key: table for key, table in (('models', self.models_table), ('datasets', self.datasets_table))
+            if any(item.get('category') == category['id'] for item in self.config.get(key, []))
+        }
+        if choice:
+            others = [cat['id'] for cat in self.config['categories'] if cat['id'] != category['id']]
+            target = simpledialog.askstring(
+                "Move items", f"Category ID to move them to ({', '.join(others)}):", parent=self.root
+            )
+            if target is None:
+                return
+            if target.strip() not in others:
+                messagebox.showwarning("Warning", f"Unknown category '{target.strip()}'!")
+                return
+            entry = {"op": "merge", "type": "category", "name": category['id'], "into": target.strip()}
+            replay(self.config, [entry])
+            for table in tables.values():
+                table.changed()
+            self.categories_listbox.delete(index)
+            self.refresh_category_choices()
+            self.record_change(entry)
+            return
+
+        for key, table in tables.items():
+            self.config[key] = [
+                item for item in self.config.get(key, []) if item.get('category') != category['id']
+            ]
+            table.reset(self.config[key])
+        del self.config['categories'][index]
+        self.categories_listbox.delete(index)
+        self.refresh_category_choices()
+        self.save_config()
 
     def refresh_models_list(self):
-        """Refresh models listbox"""
-        self.models_listbox.delete(0, tk.END)
-        for model in self.config.get('models', []):
-            self.models_listbox.insert(
-                tk.END,
-                f"{model['name']} [{model.get('category', 'N/A')}]"
-            )
+        """Refresh models table"""
+        self.models_table.reset(self.config.setdefault('models', []))
 
     def add_model(self):
         """Add a new model"""
@@ -547,9 +797,9 @@ class HFSiteBuilderGUI:
         if 'models' not in self.config:
             self.config['models'] = []
 
-        self.config['models'].append(new_model)
-        self.save_config()
-        self.refresh_models_list()
+        self.config['models'].append(Item.from_dict(new_model))
+        self.models_table.append(self.config['models'][-1])
+        self.record_change({"op": "add", "type": "model", "item": new_model})
 
         # Clear form
         self.model_name.delete(0, tk.END)
@@ -562,27 +812,25 @@ class HFSiteBuilderGUI:
 
     def delete_model(self):
         """Delete selected model"""
-        selection = self.models_listbox.curselection()
-        if not selection:
+        index = self.models_table.selected_index()
+        if index is None:
             messagebox.showwarning("Warning", "Please select a model to delete!")
             return
 
-        index = selection[0]
         model_name = self.config['models'][index]['name']
 
         if messagebox.askyesno("Confirm", f"Delete model '{model_name}'?"):
+            entry = self.remove_entry("model", 'models', index)
             del self.config['models'][index]
-            self.save_config()
-            self.refresh_models_list()
+            self.models_table.remove(index)
+            if entry is not None:
+                self.record_change(entry)
+            else:
+                self.save_config()
 
     def refresh_datasets_list(self):
-        """Refresh datasets listbox"""
-        self.datasets_listbox.delete(0, tk.END)
-        for dataset in self.config.get('datasets', []):
-            self.datasets_listbox.insert(
-                tk.END,
-                f"{dataset['name']} [{dataset.get('category', 'N/A')}]"
-            )
+        """Refresh datasets table"""
+        self.datasets_table.reset(self.config.setdefault('datasets', []))
 
     def add_dataset(self):
         """Add a new dataset"""
@@ -609,9 +857,9 @@ class HFSiteBuilderGUI:
         if 'datasets' not in self.config:
             self.config['datasets'] = []
 
-        self.config['datasets'].append(new_dataset)
-        self.save_config()
-        self.refresh_datasets_list()
+        self.config['datasets'].append(Item.from_dict(new_dataset))
+        self.datasets_table.append(self.config['datasets'][-1])
+        self.record_change({"op": "add", "type": "dataset", "item": new_dataset})
 
         # Clear form
         self.dataset_name.delete(0, tk.END)
@@ -623,56 +871,59 @@ class HFSiteBuilderGUI:
 
     def delete_dataset(self):
         """Delete selected dataset"""
-        selection = self.datasets_listbox.curselection()
-        if not selection:
+        index = self.datasets_table.selected_index()
+        if index is None:
             messagebox.showwarning("Warning", "Please select a dataset to delete!")
             return
 
-        index = selection[0]
         dataset_name = self.config['datasets'][index]['name']
 
         if messagebox.askyesno("Confirm", f"Delete dataset '{dataset_name}'?"):
+            entry = self.remove_entry("dataset", 'datasets', index)
             del self.config['datasets'][index]
-            self.save_config()
-            self.refresh_datasets_list()
+            self.datasets_table.remove(index)
+            if entry is not None:
+                self.record_change(entry)
+            else:
+                self.save_config()
 
     def refresh_preview(self):
         """Refresh JSON preview"""
         self.preview_text.delete("1.0", tk.END)
-        json_str = json.dumps(self.config, indent=2, ensure_ascii=False)
+        json_str = json.dumps(self.config, indent=2, ensure_ascii=False, default=to_json)
         self.preview_text.insert("1.0", json_str)
+        self.preview_stale = False
+
+    def mark_preview_stale(self):
+        """Redo the preview now if it is showing, else when its tab is next opened"""
+        self.preview_stale = True
+        self.refresh_preview_if_stale()
+
+    def refresh_preview_if_stale(self):
+        if self.preview_stale and self.notebook.select() == str(self.preview_tab):
+            self.refresh_preview()
 
     def validate_config(self):
-        """Validate configuration"""
-        errors = []
-
-        # Check required fields
-        if 'site' not in self.config:
-            errors.append("Missing 'site' section")
-        if 'categories' not in self.config:
-            errors.append("Missing 'categories' section")
-
-        # Check category IDs
-        category_ids = [c['id'] for c in self.config.get('categories', [])]
-
-        # Validate models
-        for model in self.config.get('models', []):
-            if model.get('category') not in category_ids:
-                errors.append(
-                    f"Model '{model.get('name')}' has invalid category: {model.get('category')}"
-                )
-
-        # Validate datasets
-        for dataset in self.config.get('datasets', []):
-            if dataset.get('category') not in category_ids:
-                errors.append(
-                    f"Dataset '{dataset.get('name')}' has invalid category: {dataset.get('category')}"
-                )
+        """Validate configuration (same rules as builder.py validate)"""
+        report = validate(self.config)
+        errors = [issue.message for issue in report.errors]
+        warnings = [issue.message for issue in report.warnings]
 
         if errors:
+            shown = errors[:VALIDATION_MESSAGES_SHOWN]
+            if len(errors) > len(shown):
+                shown.append(f"... and {len(errors) - len(shown)} more")
             messagebox.showerror(
                 "Validation Failed",
-                "Configuration has errors:\n\n" + "\n".join(errors)
+                "Configuration has errors:\n\n" + "\n".join(shown)
+            )
+        elif warnings:
+            shown = warnings[:VALIDATION_MESSAGES_SHOWN]
+            if len(warnings) > len(shown):
+                shown.append(f"... and {len(warnings) - len(shown)} more")
+            messagebox.showwarning(
+                "Validation Warnings",
+                "✅ Configuration is valid, with warnings:\n\n" + "\n".join(shown)
             )
         else:
             messagebox.showinfo("Success", "✅ Configuration is valid!")
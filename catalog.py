@@ -0,0 +1,259 @@
+"""
+HF Site Builder - compact in-memory items
+
+A loaded catalog is mostly models and datasets, and as plain dicts each one
+carries its own hash table, key slots and copies of tag and category
+strings that thousands of other items repeat. `Item` stores the same data
+in fixed ``__slots__`` with interned category ids and tags (a tuple per
+item, one string per distinct tag), which takes a fraction of the memory.
+
+Items read like the dicts they replace - ``item['name']``, ``item.get()``,
+``**item``, ``in``, ``==`` against dicts - so rendering, search, validation
+and the journal replay use them unchanged. ``item['tags']`` is a `TagList`,
+a list that writes its changes back, so ``item['tags'].append(tag)`` works
+as it does on a dict. They turn back into dicts, with
+the original key order, only when asked: `to_dict()`, or `to_json` as the
+``default=`` hook of ``json.dumps``.
+
+builder.py (and its daemon), builder_gui.py and app.py all load through
+`load_catalog()`. ``python bench/bench_memory.py`` compares the two.
+"""
+
+import sys
+from collections.abc import MutableMapping
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from journal import ITEM_KEYS
+from parse_cache import gc_paused
+
+FIELDS = ("name", "repo", "category", "description", "tags", "demo_url", "paper_url", "size")
+_FIELD_SET = frozenset(FIELDS)
+# Key orders seen so far, each with its slot setters and getter when
+# every key is a known field. Items with the same layout share its tuple.
+_LAYOUTS: Dict[tuple, Tuple[tuple, Optional[tuple], Optional[attrgetter]]] = {}
+_MISSING = object()
+
+def _layout_plan(keys: tuple):
+    plan = _LAYOUTS.get(keys)
+    if plan is None:
+        if _FIELD_SET.issuperset(keys) and keys:
+            plan = (keys, tuple(_SETTERS[key] for key in keys), attrgetter(*keys))
+        else:
+            plan = (keys, None, None)
+        _LAYOUTS[keys] = plan
+    return plan
+
+def _layout(keys: tuple) -> tuple:
+    return _layout_plan(keys)[0]
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+def _pack_tags(tags):
+    """A tuple of interned tags for a list; anything else is kept as is"""
+    if isinstance(tags, list):
+        try:
+            return tuple(map(sys.intern, tags))
+        except TypeError:  # a non-string tag
+            return tuple([_intern(tag) for tag in tags])
+    return tags
+
+class Item(MutableMapping):
+    """One model or dataset, stored compactly; see the module docstring
+
+    Known fields live in slots (an unset slot is an absent key), anything
+    else in ``_extra``. ``_keys`` remembers the key order.
+    """
+    __slots__ = FIELDS + ("_keys", "_extra")
+
+    def __init__(self, data=()):
+        self._keys = ()
+        self._extra = None
+        self.update(data)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Item":
+        """Faster than ``Item(data)`` for the usual all-known-fields dict"""
+        item = cls.__new__(cls)
+        item._keys, setters, _ = _layout_plan(tuple(data))
+        item._extra = None
+        if setters is not None:
+            for setter, value in zip(setters, data.values()):
+                setter(item, value)
+            return item
+        setters = _SETTERS
+        for key, value in data.items():
+            setter = setters.get(key)
+            if setter is not None:
+                setter(item, value)
+            else:
+                if item._extra is None:
+                    item._extra = {}
+                item._extra[key] = value
+        return item
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return _tag_list(self, value) if key == 'tags' and type(value) is tuple else value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                return default
+            return _tag_list(self, value) if key == 'tags' and type(value) is tuple else value
+        return default if self._extra is None else self._extra.get(key, default)
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            self._keys = _layout(self._keys + (key,))
+        setter = _SETTERS.get(key)
+        if setter is not None:
+            setter(self, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        self._keys = _layout(tuple(k for k in self._keys if k != key))
+        if key in _FIELD_SET:
+            delattr(self, key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        for key in self._keys:
+            if key in _FIELD_SET:
+                delattr(self, key)
+        self._keys = ()
+        self._extra = None
+
+    def _value(self, key):
+        return getattr(self, key) if key in _FIELD_SET else self._extra[key]
+
+    def to_dict(self) -> Dict:
+        """The item as the plain dict it was loaded from"""
+        keys = self._keys
+        getter = _layout_plan(keys)[2]
+        if getter is None:
+            data = {key: self._value(key) for key in keys}
+        else:
+            data = dict(zip(keys, getter(self))) if len(keys) > 1 else {keys[0]: getter(self)}
+        tags = data.get('tags')
+        if type(tags) is tuple:
+            data['tags'] = list(tags)
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, Item):
+            # Compares the packed values: no dicts built
+            if set(self._keys) != set(other._keys):
+                return False
+            return all(self._value(key) == other._value(key) for key in self._keys)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Item({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Pickle (e.g. for render's process pool) as the plain dict
+        return (Item.from_dict, (self.to_dict(),))
+
+class TagList(list):
+    """``item['tags']``: a copy of the packed tags that writes every change
+    back to the item, unless the item's tags were replaced in the meantime"""
+    __slots__ = ("_item", "_packed")
+
+def _tag_list(item: Item, packed: tuple) -> TagList:
+    # No __init__: a Python-level one would make every tags lookup twice as slow
+    tags = TagList(packed)
+    tags._item = item
+    tags._packed = packed
+    return tags
+
+def _writing_back(method):
+    def write_back(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        item = self._item
+        if getattr(item, 'tags', None) is self._packed:
+            _SETTERS['tags'](item, self)
+            self._packed = item.tags
+        return result
+    write_back.__name__ = method.__name__
+    return write_back
+
+for _name in ("append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+              "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(TagList, _name, _writing_back(getattr(list, _name)))
+
+def _packing(slot, pack):
+    def setter(item, value):
+        slot(item, pack(value))
+    return setter
+
+# Slot setters by field, packing tags and category ids on the way in
+_SETTERS = {field: getattr(Item, field).__set__ for field in FIELDS}
+_SETTERS['tags'] = _packing(_SETTERS['tags'], _pack_tags)
+_SETTERS['category'] = _packing(_SETTERS['category'], _intern)
+
+def to_json(value):
+    """``default=`` hook for json.dumps: Items are written as their dicts"""
+    if isinstance(value, Item):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def compact_items(items: Iterable[Dict]) -> List[Item]:
+    """Items for a list of item dicts (well-formed or not: non-dicts are kept)"""
+    from_dict = Item.from_dict
+    # Items hold no cycles, and a GC pass every few hundred allocations
+    # would double the conversion time
+    with gc_paused():
+        return [from_dict(item) if type(item) is dict else item for item in items]
+
+def compact(config: Dict) -> Dict:
+    """Replace the item dicts of a loaded config with Items, in place"""
+    for key in ITEM_KEYS.values():
+        if isinstance(config.get(key), list):
+            config[key] = compact_items(config[key])
+    for category in config.get('categories') or []:
+        if isinstance(category, dict) and type(category.get('id')) is str:
+            category['id'] = sys.intern(category['id'])
+    return config
+
+def plain(config: Dict) -> Dict:
+    """Shallow copy of `config` whose item lists hold dicts again (for
+    marshal, which only handles built-in types)"""
+    copy = dict(config)
+    for key in ITEM_KEYS.values():
+        items = config.get(key)
+        if isinstance(items, list):
+            copy[key] = [item.to_dict() if isinstance(item, Item) else item for item in items]
+    return copy
+
+def load_catalog(storage) -> Dict:
+    """Load a config from `storage` (see storage.py) with compact items"""
+    return compact(storage.load())
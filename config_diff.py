@@ -0,0 +1,62 @@
+"""
+HF Site Builder - structural diff between two configs
+
+Items are matched by identity (type, name and repo) rather than by list
+position, so the diff is O(n) and insensitive to unrelated edits elsewhere
+in the file.
+"""
+
+ITEM_SECTIONS = (('models', 'model'), ('datasets', 'dataset'))
+
+def item_identity(item, item_type):
+    """Return the key an item is matched on across configs"""
+    return (item_type, item.get('name'), item.get('repo'))
+
+def diff_items(old_config, new_config):
+    """Compare the models and datasets of two configs
+
+    Returns ``(added, removed, modified)``: lists of new items, old items and
+    ``(old, new)`` pairs, each entry tagged with its item type as
+    ``(item_type, item)`` or ``(item_type, old, new)``.
+    """
+    added, removed, modified = [], [], []
+    for section, item_type in ITEM_SECTIONS:
+        old_items = {item_identity(i, item_type): i for i in old_config.get(section, [])}
+        for item in new_config.get(section, []):
+            key = item_identity(item, item_type)
+            old_item = old_items.pop(key, None)
+            if old_item is None:
+                added.append((item_type, item))
+            elif old_item != item:
+                modified.append((item_type, old_item, item))
+        removed.extend((item_type, item) for item in old_items.values())
+    return added, removed, modified
+
+def diff_categories(old_config, new_config):
+    """Compare categories by id; returns ``(added, removed, modified)`` like
+    `diff_items`, without the type tags"""
+    old_categories = {c.get('id'): c for c in old_config.get('categories', [])}
+    added, modified = [], []
+    for category in new_config.get('categories', []):
+        old_category = old_categories.pop(category.get('id'), None)
+        if old_category is None:
+            added.append(category)
+        elif old_category != category:
+            modified.append((old_category, category))
+    return added, list(old_categories.values()), modified
+
+def changed_fields(old, new):
+    """Return the keys whose values differ between two dicts, in order"""
+    keys = list(old) + [key for key in new if key not in old]
+    return [key for key in keys if old.get(key) != new.get(key)]
+
+def changed_categories(old_config, new_config):
+    """Return the ids of categories whose items differ between two configs"""
+    added, removed, modified = diff_items(old_config, new_config)
+    changed = set()
+    for _, item in added + removed:
+        changed.add(item.get('category'))
+    for _, old_item, new_item in modified:
+        changed.add(old_item.get('category'))
+        changed.add(new_item.get('category'))
+    return changed
@@ -0,0 +1,298 @@
+"""
+HF Site Builder - long-running builder daemon
+
+``builder.py serve`` loads the config once and answers builder.py commands
+over a Unix socket (``.config.sock`` next to config.json), so scripted
+edits skip Python startup, the config parse and a journal fsync per
+command. While it runs, builder.py forwards its command line to it
+(set HF_SITE_NO_DAEMON=1 to run locally instead).
+
+The protocol is one JSON object per line, any number per connection::
+
+    -> {"argv": ["add-model", "Llama", "meta/llama", "nlp"], "cwd": "/path"}
+    <- {"exit": 0, "stdout": "...", "stderr": ""}
+    -> {"control": "flush"}            (or "stop")
+    <- {"exit": 0, "stdout": "", "stderr": ""}
+
+Edits are applied to the in-memory config at once and written to the
+storage in batches: one journal write (or one SQLite transaction) per
+flush interval, however many commands arrived. Full saves (import,
+import-config) are written through immediately. Changes acknowledged but
+not yet flushed are lost if the daemon is killed with SIGKILL; SIGTERM,
+SIGINT and ``serve --stop`` flush first.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from catalog import Item, compact, load_catalog
+from journal import ITEM_KEYS, Replay
+from storage import count_categories, find_in_config, iter_config_items
+from watcher import ConfigWatcher
+
+NO_DAEMON_ENV = "HF_SITE_NO_DAEMON"
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+def socket_path(config_file: Path) -> Path:
+    """Socket the daemon serving `config_file` listens on"""
+    config_file = Path(config_file)
+    return config_file.with_name("." + config_file.stem + ".sock")
+
+def daemon_enabled() -> bool:
+    return os.environ.get(NO_DAEMON_ENV, "0") != "1"
+
+class MemoryStorage:
+    """The config held in memory in front of a storage, with batched writes
+
+    Same interface as the storages in storage.py. `apply()` changes the
+    in-memory config and queues the entries; `flush()` writes the queue to
+    the backing storage in one batch. Other attributes (``kind``,
+    ``journal``, ``path``...) come from the backing storage.
+    """
+    # Changes are on disk only after the next flush
+    queues_writes = True
+
+    def __init__(self, backing):
+        self.backing = backing
+        self.pending: List[Dict] = []
+        self.pending_since = None
+        self.reload()
+
+    def __getattr__(self, name):
+        return getattr(self.backing, name)
+
+    def reload(self):
+        """(Re)read the config from the backing storage"""
+        self.config = load_catalog(self.backing)
+        self._replay = Replay(self.config)
+        self.watcher = ConfigWatcher(self.backing.watch_paths, self._reload_changed)
+
+    def _reload_changed(self):
+        # Queued edits go to the journal first, so they are replayed on top
+        self.flush()
+        self.reload()
+
+    def reopen(self, backing):
+        """Switch to another backing storage (after a migration)"""
+        self.flush()
+        self.backing = backing
+        self.reload()
+
+    def check_external_changes(self) -> bool:
+        """Reload if another process wrote the files (two stat() calls)"""
+        return self.watcher.check()
+
+    def exists(self) -> bool:
+        return True
+
+    def load(self) -> Dict:
+        # New lists, so callers can append and pass the result to save()
+        config = dict(self.config)
+        config['site'] = dict(config.get('site', {}))
+        for key in ('categories', *ITEM_KEYS.values()):
+            config[key] = list(config.get(key, []))
+        return config
+
+    def save(self, config: Dict) -> List[Path]:
+        """Write a full snapshot now; queued entries are part of `config`"""
+        written = self.backing.save(config)
+        self.config = compact(config)
+        self._replay = Replay(config)
+        self.pending, self.pending_since = [], None
+        self.watcher.reset()
+        return written
+
+    def apply(self, entries: List[Dict]):
+        """Apply mutations in memory and queue them for the next flush"""
+        for entry in entries:
+            if entry.get('op') == 'add' and entry.get('type') in ITEM_KEYS:
+                # The queued entry stays a plain dict for the journal
+                entry = {**entry, 'item': Item.from_dict(entry['item'])}
+            self._replay.apply(entry)
+        self.config = self._replay.finish()
+        if not self.pending:
+            self.pending_since = time.monotonic()
+        self.pending.extend(entries)
+
+    def append(self, entry: Dict) -> Path:
+        self.apply([entry])
+        return self.backing.journal.path if self.backing.journal is not None else self.backing.path
+
+    def flush_due(self, interval: float) -> bool:
+        return bool(self.pending) and time.monotonic() - self.pending_since >= interval
+
+    def flush(self) -> int:
+        """Write the queued entries with one backing write; returns how many"""
+        if not self.pending:
+            return 0
+        entries = self.pending
+        self.backing.apply(entries)
+        self.pending, self.pending_since = [], None
+        if self.backing.needs_compaction():
+            # Already in memory: no need to reload the snapshot
+            self.backing.save(self.config)
+        self.watcher.reset()
+        return len(entries)
+
+    def site(self) -> Dict:
+        return self.config.get('site', {})
+
+    def categories(self) -> List[Dict]:
+        return self.config.get('categories', [])
+
+    def count(self, item_type: str) -> int:
+        return len(self.config.get(ITEM_KEYS[item_type], []))
+
+    def category_counts(self) -> Dict[str, int]:
+        return count_categories(self.config)
+
+    def iter_items(self, item_types=tuple(ITEM_KEYS), name=None, category=None, tag=None) -> Iterator[Tuple[str, Dict]]:
+        return iter_config_items(self.config, item_types, name, category, tag)
+
+    def find(self, item_type: str, name=None, category=None, tag=None) -> List[Dict]:
+        return find_in_config(self.config, item_type, name, category, tag)
+
+    def needs_compaction(self) -> bool:
+        # Checked on flush instead, so edits never wait for a compaction
+        return False
+
+    def compact(self) -> List[Path]:
+        self.flush()
+        if self.backing.journal is None or not self.backing.journal.size():
+            return []
+        return self.save(self.config)
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+            response = self.server.respond(request)
+            stop = isinstance(request, dict) and request.get('control') == 'stop'
+            if stop:
+                # Stop listening before answering, so the next command
+                # doesn't reach a daemon on its way out
+                self.server.stop()
+            try:
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+                self.wfile.flush()
+            finally:
+                if stop:
+                    self.server.stop_answered.set()
+            if stop:
+                return
+
+class BuilderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Runs commands one at a time against a `MemoryStorage`
+
+    `run(argv)` executes one command and returns ``(exit code, stdout,
+    stderr)``. Connections get a thread each, so an idle client doesn't
+    block the others, but commands and flushes share one lock.
+    """
+    daemon_threads = True
+
+    def __init__(self, path: Path, storage: MemoryStorage, run, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.socket_file = Path(path)
+        self.storage = storage
+        self.run = run
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.stop_answered = threading.Event()
+        self.stopping = False
+        if self.socket_file.exists():
+            running = connect(self.socket_file)
+            if running is not None:
+                running.close()
+                raise OSError(f"a daemon is already listening on {self.socket_file}")
+            self.socket_file.unlink()  # left behind by a killed daemon
+        super().__init__(str(self.socket_file), _Handler)
+
+    def respond(self, request: Dict) -> Dict:
+        if not isinstance(request, dict):
+            return {"exit": 2, "stdout": "", "stderr": "invalid request\n"}
+        with self.lock:
+            control = request.get('control')
+            if control in ('flush', 'stop'):
+                flushed = self.storage.flush()
+                return {"exit": 0, "stdout": f"✅ {flushed} pending changes written\n", "stderr": ""}
+            if control is not None or not isinstance(request.get('argv'), list):
+                return {"exit": 2, "stdout": "", "stderr": f"invalid request: {request!r}\n"}
+
+            self.storage.check_external_changes()
+            cwd = os.getcwd()
+            try:
+                if request.get('cwd'):
+                    os.chdir(request['cwd'])
+                code, out, err = self.run([str(arg) for arg in request['argv']])
+            finally:
+                os.chdir(cwd)
+            return {"exit": code, "stdout": out, "stderr": err}
+
+    def service_actions(self):
+        """Called by serve_forever() between requests: flush on the timer"""
+        if self.storage.flush_due(self.flush_interval):
+            with self.lock:
+                self.storage.flush()
+
+    def _close(self):
+        self.server_close()
+        try:
+            self.socket_file.unlink()
+        except FileNotFoundError:
+            pass
+
+    def stop(self):
+        """Stop serve() from a handler thread"""
+        self.stopping = True
+        # Handlers run in their own threads, so this can wait for
+        # serve_forever() to return
+        self.shutdown()
+        self._close()
+
+    def serve(self):
+        """Serve until stopped, then flush and remove the socket"""
+        try:
+            self.serve_forever(poll_interval=min(self.flush_interval, 0.5))
+        finally:
+            self._close()
+            with self.lock:
+                self.storage.flush()
+            if self.stopping:
+                # Handler threads die with the process: let `--stop` get its answer
+                self.stop_answered.wait(5)
+
+def connect(path: Path) -> Optional[socket.socket]:
+    """A connection to the daemon at `path`, or None if none is listening"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def send_request(path: Path, message: Dict) -> Optional[Dict]:
+    """Send one request and wait for the response; None without a daemon"""
+    sock = connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile('rwb') as f:
+        try:
+            f.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n")
+            f.flush()
+        except OSError:
+            return None  # the daemon is shutting down; nothing was run
+        line = f.readline()
+    if not line:
+        raise ConnectionError(f"the daemon on {path} closed the connection")
+    return json.loads(line)
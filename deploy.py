@@ -0,0 +1,194 @@
+"""
+HF Site Builder - content-hash manifest and incremental deploys
+
+`app.py export` writes ``.manifest.json`` next to the static files: the
+sha256 of every file it produced. A deploy target (a local directory, or
+an HTTP server accepting PUT and DELETE) keeps the manifest of what it
+last received, so `deploy(..., incremental=True)` compares the two and
+sends only new or changed files, deletes files the export no longer
+produces, and uploads the manifest last. An interrupted deploy therefore
+leaves the old manifest in place and the next one resends what is missing.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_FORMAT = "hf-site-builder/static"
+MANIFEST_VERSION = 1
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_manifest(out_dir: Path, files: Iterable[Path]) -> Dict:
+    """Manifest of `files` (paths inside `out_dir`), keyed by relative path"""
+    out_dir = Path(out_dir)
+    return {
+        "format": MANIFEST_FORMAT,
+        "version": MANIFEST_VERSION,
+        "files": {
+            Path(path).relative_to(out_dir).as_posix(): file_hash(path)
+            for path in sorted(files)
+        },
+    }
+
+def manifest_text(manifest: Dict) -> str:
+    return json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+
+def write_manifest(out_dir: Path, files: Iterable[Path]) -> Path:
+    """Write ``.manifest.json`` for an export; returns its path"""
+    path = Path(out_dir) / MANIFEST_NAME
+    path.write_text(manifest_text(build_manifest(out_dir, files)), encoding='utf-8')
+    return path
+
+def parse_manifest(text: Optional[str]) -> Dict[str, str]:
+    """File hashes from a manifest's text; {} for none or an unknown format"""
+    if not text:
+        return {}
+    try:
+        manifest = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("format") != MANIFEST_FORMAT:
+        return {}
+    return manifest.get("files", {})
+
+def remove_stale_files(out_dir: Path, files: Iterable[Path]) -> List[str]:
+    """Delete the files the previous export's manifest lists but `files`
+    (this export's) doesn't, e.g. pages of removed categories; returns them
+
+    Call before `write_manifest()`, which replaces the previous manifest.
+    """
+    out_dir = Path(out_dir)
+    manifest_path = out_dir / MANIFEST_NAME
+    previous = parse_manifest(manifest_path.read_text(encoding='utf-8') if manifest_path.exists() else None)
+    current = {Path(path).relative_to(out_dir).as_posix() for path in files}
+    stale = sorted(name for name in previous if name not in current and is_safe_name(name))
+    for name in stale:
+        (out_dir / name).unlink(missing_ok=True)
+    return stale
+
+def is_safe_name(name: str) -> bool:
+    """A relative path that stays inside the deploy root"""
+    parts = name.split('/')
+    return bool(name) and not name.startswith('/') and '..' not in parts and '\\' not in name
+
+def plan(deployed: Dict[str, str], exported: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """Files to upload (new or changed hash) and to delete (gone from the export)"""
+    upload = [name for name, digest in exported.items() if deployed.get(name) != digest]
+    # The target's manifest is not trusted to name files outside it
+    delete = [name for name in deployed if name not in exported and is_safe_name(name)]
+    return upload, delete
+
+class DirectoryTarget:
+    """Deploy into a local directory (e.g. a checkout served by nginx)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def __str__(self):
+        return str(self.path)
+
+    def read(self, name: str) -> Optional[str]:
+        try:
+            return (self.path / name).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+
+    def put(self, name: str, source: Path):
+        target = self.path / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+
+    def delete(self, name: str):
+        try:
+            (self.path / name).unlink()
+        except FileNotFoundError:
+            pass
+
+class HttpTarget:
+    """Deploy to an HTTP server: GET the manifest, PUT and DELETE files
+
+    Files go to ``<url>/<relative path>``. Set HF_SITE_DEPLOY_TOKEN to send
+    it as a bearer token.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url if url.endswith('/') else url + '/'
+        self.timeout = timeout
+        self.headers = {}
+        token = os.environ.get("HF_SITE_DEPLOY_TOKEN")
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    def __str__(self):
+        return self.url
+
+    def _request(self, method: str, name: str, data: Optional[bytes] = None, content_type: Optional[str] = None):
+        request = urllib.request.Request(self.url + name, data=data, method=method, headers=dict(self.headers))
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+    def read(self, name: str) -> Optional[str]:
+        try:
+            return self._request("GET", name).decode('utf-8')
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    def put(self, name: str, source: Path):
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self._request("PUT", name, source.read_bytes(), content_type)
+
+    def delete(self, name: str):
+        try:
+            self._request("DELETE", name)
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                raise
+
+def open_target(target: str):
+    """An HttpTarget for http(s) URLs, else a DirectoryTarget"""
+    if target.startswith(("http://", "https://")):
+        return HttpTarget(target)
+    return DirectoryTarget(target)
+
+def deploy(out_dir: Path, target, incremental: bool = True, dry_run: bool = False) -> Tuple[List[str], List[str], int]:
+    """Send an export (with its manifest) to `target`
+
+    Returns ``(uploaded, deleted, unchanged count)``. Without `incremental`
+    every file is sent; files the target's manifest lists but the export
+    no longer has are deleted either way.
+    """
+    out_dir = Path(out_dir)
+    manifest_path = out_dir / MANIFEST_NAME
+    exported = parse_manifest(manifest_path.read_text(encoding='utf-8'))
+    deployed = parse_manifest(target.read(MANIFEST_NAME))
+
+    upload, delete = plan(deployed, exported)
+    if not incremental:
+        upload = list(exported)
+    if not dry_run:
+        for name in upload:
+            target.put(name, out_dir / name)
+        for name in delete:
+            target.delete(name)
+        # Last: it is what the next deploy trusts
+        target.put(MANIFEST_NAME, manifest_path)
+    return upload, delete, len(exported) - len(upload)
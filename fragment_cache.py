@@ -0,0 +1,134 @@
+"""
+HF Site Builder - content-hash fragment cache for rendered cards
+
+Cards are keyed by a stable hash of the item dict, so the same item is
+rendered once no matter how many tabs show it. An optional JSON file
+keeps fragments across restarts.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from render import TEMPLATE_VERSION
+
+def item_key(item, item_type="model"):
+    """Return a stable content hash for an item dict
+
+    marshal is several times cheaper than json.dumps and is stable for a
+    given Python version, which is all a cache key needs; a different
+    interpreter simply misses. Format 2 is used because later ones share
+    repeated objects depending on their reference counts, so equal items
+    could get different keys. Values marshal can't handle fall back to JSON.
+    """
+    if type(item) is not dict:
+        item = item.to_dict()  # a compact catalog.Item: same key as its dict
+    try:
+        payload = marshal.dumps((TEMPLATE_VERSION, item_type, item), 2)
+    except ValueError:
+        payload = json.dumps(
+            [TEMPLATE_VERSION, item_type, item],
+            sort_keys=True, ensure_ascii=False, default=str
+        ).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+class FragmentCache:
+    """Two-tier (in-memory LRU + optional on-disk) cache of rendered cards
+
+    `render` is a ``render_*`` style function ``render(out, item, item_type)``.
+    `path`, when given, is a JSON file loaded on first use and rewritten by
+    `save()`. A save merges the fragments used since the last one into the
+    file, so a partial build (one page, one export) never drops the rest.
+    The file keeps the `maxsize` most recently used fragments, which is how
+    entries for deleted or edited items eventually drop out.
+    """
+
+    def __init__(self, render, maxsize=100_000, path=None):
+        self.render = render
+        self.maxsize = maxsize
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._disk = None
+        self._used = {}
+        self._unsaved = 0
+
+    def _load_disk(self):
+        self._disk = {}
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._disk = json.load(f)
+            except (OSError, ValueError):
+                self._disk = {}
+
+    def get(self, item, item_type="model"):
+        """Return the HTML for `item`, rendering it only on a miss"""
+        key = item_key(item, item_type)
+        html = self._memory.get(key)
+        if html is not None:
+            self.hits += 1
+            self._memory.move_to_end(key)
+        else:
+            if self.path is not None:
+                if self._disk is None:
+                    self._load_disk()
+                html = self._disk.get(key)
+            if html is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                self._unsaved += 1
+                out = []
+                self.render(out, item, item_type)
+                html = "".join(out)
+            self._memory[key] = html
+            if len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+        if self.path is not None:
+            self._used[key] = html
+        return html
+
+    def render_item_card(self, out, item, item_type="model"):
+        """Drop-in replacement for `render.render_item_card`"""
+        out.append(self.get(item, item_type))
+
+    def save(self):
+        """Merge the fragments used since the last save into the on-disk tier"""
+        # Nothing was rendered that the file doesn't already have
+        if self.path is None or not self._unsaved:
+            return
+        if self._disk is None:
+            self._load_disk()
+        # Oldest first: fragments not used since the last save, then the used ones
+        merged = {key: html for key, html in self._disk.items() if key not in self._used}
+        merged.update(self._used)
+        if len(merged) > self.maxsize:
+            merged = dict(list(merged.items())[len(merged) - self.maxsize:])
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self._disk, self._used, self._unsaved = merged, {}, 0
+
+    def clear(self):
+        """Drop the in-memory tier and reset the counters"""
+        self._memory.clear()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters as a dict"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "size": len(self._memory),
+        }
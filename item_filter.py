@@ -0,0 +1,203 @@
+"""
+HF Site Builder - filter index behind the GUI's item tables
+
+builder_gui.py shows models and datasets in virtualized tables with a
+filter box. `ItemFilter` answers each keystroke without looking at every
+item: words of names and tags go in a sorted vocabulary, so a prefix
+("lla" for "Llama") is a bisect plus the union of a few posting sets,
+and each sortable column keeps its row order, kept up to date on edits.
+Queries use search.py's syntax: words are ANDed, ``tag:<name>`` selects
+an exact tag.
+
+Rows have stable ids assigned in config order. An added item gets the
+next id and a removed one leaves a gap, so the live ids, ascending, are
+the item's positions in the config list.
+"""
+
+import bisect
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from parse_cache import gc_paused
+from search import parse_query, tokenize
+
+SORT_COLUMNS = ("name", "category", "repo")
+# Prefix lookups remembered between keystrokes (cleared on edits)
+PREFIX_CACHE_SIZE = 256
+
+def sort_key(value) -> str:
+    """Case-insensitive key that also orders missing or malformed values"""
+    if isinstance(value, str):
+        return value.lower()
+    return "" if value is None else str(value).lower()
+
+def column_key(column: str) -> Callable[[Dict], str]:
+    return lambda item: sort_key(item.get(column))
+
+def item_words(item: Dict) -> Set[str]:
+    """Words a filter matches by prefix: the name's and the tags'"""
+    words = set(tokenize(item.get('name') if isinstance(item.get('name'), str) else None))
+    for tag in item.get('tags') or ():
+        if isinstance(tag, str):
+            words.update(tokenize(tag))
+    return words
+
+class ItemFilter:
+    """Filter and sort state for one list of items (e.g. config['models'])"""
+
+    def __init__(self, items: Iterable[Dict]):
+        self.reset(items)
+
+    def reset(self, items: Iterable[Dict]):
+        """Start over from a new list; the index is rebuilt by `prepare()` or the first query"""
+        self.rows: List[Optional[Dict]] = list(items)   # id -> item, None once removed
+        self.ids: List[int] = list(range(len(self.rows)))  # live ids, config order
+        self._orders: Dict[str, List[int]] = {}
+        self._invalidate_index()
+
+    def _invalidate_index(self):
+        self._postings: Optional[Dict[str, Set[int]]] = None  # word -> ids
+        self._tags: Optional[Dict[str, Set[int]]] = None      # exact tag -> ids
+        self._words: List[str] = []                             # sorted vocabulary
+        self._prefixes: Dict[str, Set[int]] = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def item(self, item_id: int) -> Dict:
+        return self.rows[item_id]
+
+    def index_of(self, item_id: int) -> Optional[int]:
+        """Position of a row in the config list, or None if it was removed"""
+        if self.rows[item_id] is None:
+            return None
+        return bisect.bisect_left(self.ids, item_id)
+
+    def _index_item(self, item_id: int, item: Dict):
+        for word in item_words(item):
+            ids = self._postings.get(word)
+            if ids is None:
+                ids = self._postings[word] = set()
+                bisect.insort(self._words, word)
+            ids.add(item_id)
+        for tag in item.get('tags') or ():
+            if isinstance(tag, str):
+                self._tags.setdefault(tag, set()).add(item_id)
+
+    def _build(self):
+        postings, tags = {}, {}
+        rows = self.rows
+        with gc_paused():
+            for item_id in self.ids:
+                item = rows[item_id]
+                name = item.get('name')
+                if isinstance(name, str):
+                    for word in tokenize(name):
+                        ids = postings.get(word)
+                        if ids is None:
+                            ids = postings[word] = set()
+                        ids.add(item_id)
+                for tag in item.get('tags') or ():
+                    if isinstance(tag, str):
+                        ids = tags.get(tag)
+                        if ids is None:
+                            ids = tags[tag] = set()
+                        ids.add(item_id)
+            # Tags repeat across items: tokenize each distinct one once
+            for tag, ids in tags.items():
+                for word in set(tokenize(tag)):
+                    postings.setdefault(word, set()).update(ids)
+        self._postings, self._tags = postings, tags
+        self._words = sorted(postings)
+
+    def _prefix(self, prefix: str) -> Set[int]:
+        """Ids with a word starting with `prefix`; read-only"""
+        ids = self._prefixes.get(prefix)
+        if ids is None:
+            words = self._words
+            start = bisect.bisect_left(words, prefix)
+            # Every word with this prefix sorts before its successor
+            end = bisect.bisect_left(words, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+            postings = [self._postings[word] for word in words[start:end]]
+            ids = postings[0] if len(postings) == 1 else set().union(*postings)
+            if len(self._prefixes) >= PREFIX_CACHE_SIZE:
+                self._prefixes.clear()
+            self._prefixes[prefix] = ids
+        return ids
+
+    def prepare(self):
+        """Build the index now (e.g. when idle) instead of on the first query"""
+        if self._postings is None:
+            self._build()
+
+    def match(self, query: str) -> Optional[Set[int]]:
+        """Ids matching every word (by prefix) and tag; None for no filter"""
+        terms, tags = parse_query(query)
+        if not terms and not tags:
+            return None
+        self.prepare()
+        found = [self._prefix(term) for term in terms] + [self._tags.get(tag, set()) for tag in tags]
+        found.sort(key=len)
+        return found[0].intersection(*found[1:]) if len(found) > 1 else found[0]
+
+    def order(self, column: Optional[str] = None) -> List[int]:
+        """Live ids sorted by `column` (ties in config order); read-only"""
+        if column is None:
+            return self.ids
+        order = self._orders.get(column)
+        if order is None:
+            key = column_key(column)
+            rows = self.rows
+            order = self._orders[column] = sorted(self.ids, key=lambda item_id: key(rows[item_id]))
+        return order
+
+    def view(self, query: str = "", column: Optional[str] = None, reverse: bool = False) -> List[int]:
+        """Ids to show for a filter and sort; read-only"""
+        order = self.order(column)
+        matches = self.match(query)
+        if matches is None:
+            view = order
+        elif len(matches) * 16 < len(order):
+            # Few hits: sorting them beats scanning the whole order
+            rows = self.rows
+            key = column_key(column) if column else None
+            view = sorted(matches)
+            if key is not None:
+                view.sort(key=lambda item_id: key(rows[item_id]))
+        else:
+            view = [item_id for item_id in order if item_id in matches]
+        return view[::-1] if reverse else view
+
+    def add(self, item: Dict) -> int:
+        """Track an item appended to the config list; returns its id"""
+        item_id = len(self.rows)
+        self.rows.append(item)
+        self.ids.append(item_id)
+        rows = self.rows
+        for column, order in self._orders.items():
+            key = column_key(column)
+            # Inserted after equal keys: the new id is the largest
+            bisect.insort(order, item_id, key=lambda other: key(rows[other]))
+        if self._postings is not None:
+            self._index_item(item_id, item)
+            self._prefixes.clear()
+        return item_id
+
+    def remove(self, index: int):
+        """Forget the item at `index` of the config list"""
+        item_id = self.ids.pop(index)
+        item = self.rows[item_id]
+        self.rows[item_id] = None
+        for order in self._orders.values():
+            order.remove(item_id)
+        if self._postings is not None:
+            for word in item_words(item):
+                self._postings[word].discard(item_id)
+            for tag in item.get('tags') or ():
+                if isinstance(tag, str):
+                    self._tags[tag].discard(item_id)
+            self._prefixes.clear()
+
+    def changed(self):
+        """Items were edited in place (e.g. moved to another category)"""
+        self._orders.clear()
+        self._invalidate_index()
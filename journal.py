@@ -0,0 +1,275 @@
+"""
+HF Site Builder - append-only mutation journal
+
+Small edits from builder.py (add, remove, update site) are appended to
+``config.journal`` next to config.json as one JSON object per line, each
+fsync'd before the command returns, instead of rewriting the whole config.
+Readers load the last snapshot and replay the journal on top of it;
+compaction writes a new snapshot and empties the journal.
+
+Entries look like::
+
+    {"op": "add", "type": "model", "item": {...}}
+    {"op": "remove", "type": "dataset", "name": "...", "repo": "..."}
+    {"op": "update", "type": "model", "name": "...", "repo": "...", "item": {...}}
+    {"op": "update_site", "fields": {"title": "..."}}
+    {"op": "rename", "type": "category", "name": "old-id", "to": "new-id"}
+    {"op": "merge", "type": "category", "name": "old-id", "into": "other-id"}
+
+Removes and updates match items by name, and also by repo when the entry
+has one; an update replaces the matched items with ``item``. Renaming or
+merging a category moves every item that references it, so a change that
+touches thousands of items is still one short entry.
+
+Replaying an entry twice is not always harmless (an update followed by
+an add of the old item adds it again), so entries already in a snapshot
+must never be replayed over it. Before writing a snapshot, compaction
+appends a checkpoint naming the snapshot the entries apply to::
+
+    {"op": "checkpoint", "snapshot": "<sha256 of the snapshot file>"}
+
+If it crashes before emptying the journal, the snapshot on disk no longer
+matches the checkpoint, so `pending_entries()` drops everything up to it.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+JOURNAL_SUFFIX = ".journal"
+ITEM_KEYS = {"model": "models", "dataset": "datasets"}
+CHECKPOINT_OP = "checkpoint"
+
+def journal_path(config_file: Path) -> Path:
+    """Journal file that belongs to `config_file`"""
+    config_file = Path(config_file)
+    return config_file.with_name(config_file.stem + JOURNAL_SUFFIX)
+
+class MutationJournal:
+    """Append-only JSON-lines file of config mutations"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, entry: Dict):
+        """Append one entry and fsync it"""
+        self.extend([entry])
+
+    def extend(self, entries: List[Dict]):
+        """Append several entries with a single write and fsync"""
+        text = "".join(
+            json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n" for entry in entries
+        )
+        with open(self.path, 'a+b') as f:
+            self._repair_tail(f)
+            f.write(text.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _repair_tail(self, f):
+        """Make the file end at a line boundary before appending to it
+
+        A torn last line (a crash during `extend`) is cut off, as `entries()`
+        ignores it; otherwise the next entry would be glued onto it and lost.
+        A complete entry that only lacks its newline gets one.
+        """
+        end = f.seek(0, os.SEEK_END)
+        if not end:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        # Find the start of the last line, reading backwards
+        start, block = end, 1 << 12
+        while start > 0:
+            read_from = max(0, start - block)
+            f.seek(read_from)
+            newline = f.read(start - read_from).rfind(b"\n")
+            if newline >= 0:
+                start = read_from + newline + 1
+                break
+            start = read_from
+        f.seek(start)
+        try:
+            json.loads(f.read())
+        except ValueError:
+            f.truncate(start)
+        else:
+            f.write(b"\n")
+
+    def entries(self, offset: int = 0) -> Iterator[Dict]:
+        """Yield the journal's entries in order, starting at byte `offset`
+        (which must be a line boundary, e.g. an earlier `size()`)
+
+        A torn last line (a crash during `append`) is ignored; a malformed
+        line anywhere else is an error.
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            pending = None
+            for line in f:
+                if pending is not None:
+                    raise ValueError(f"{self.path}: malformed journal entry at byte {pending}")
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    pending = f.tell() - len(line)
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+def checkpoint_entry(snapshot_digest) -> Dict:
+    return {"op": CHECKPOINT_OP, "snapshot": snapshot_digest}
+
+def pending_entries(entries: Iterable[Dict], snapshot_digest: Callable[[], Optional[str]]) -> List[Dict]:
+    """The entries the snapshot with `snapshot_digest` doesn't include yet
+
+    Entries up to a checkpoint are already in the snapshot unless it is
+    still the one the checkpoint names (that compaction never got to write
+    it), so everything up to the last checkpoint naming another snapshot
+    is dropped.
+    """
+    entries = list(entries)
+    digest = None
+    for position in range(len(entries) - 1, -1, -1):
+        if entries[position].get('op') == CHECKPOINT_OP:
+            if digest is None:
+                digest = snapshot_digest()
+            if entries[position].get('snapshot') != digest:
+                entries = entries[position + 1:]
+                break
+    return [entry for entry in entries if entry.get('op') != CHECKPOINT_OP]
+
+class Replay:
+    """Applies entries to a config, indexing items by name on first use
+
+    Removed items are collected and filtered out in one pass by `finish()`,
+    so replaying many removes against a large config stays linear. The
+    index survives `finish()`: a long-lived config (the builder daemon's)
+    can keep applying batches without re-indexing. Category renames and
+    merges go through a category -> items index, built on first use and
+    dropped whenever an item is added, removed or replaced.
+    """
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.by_name = {}
+        self.by_category = None
+        self.removed = set()
+
+    def _index(self, key: str) -> Dict[str, List[Dict]]:
+        index = self.by_name.get(key)
+        if index is None:
+            index = self.by_name[key] = {}
+            for item in self.config.setdefault(key, []):
+                index.setdefault(item.get('name'), []).append(item)
+        return index
+
+    def _category_index(self) -> Dict[str, List[Dict]]:
+        if self.by_category is None:
+            self.by_category = {}
+            for key in ITEM_KEYS.values():
+                for item in self.config.setdefault(key, []):
+                    category = item.get('category')
+                    # A malformed (list/dict) category can't match an id
+                    if id(item) not in self.removed and not isinstance(category, (list, dict)):
+                        self.by_category.setdefault(category, []).append(item)
+        return self.by_category
+
+    def _move_items(self, source, target):
+        """Point every item in category `source` at `target`"""
+        index = self._category_index()
+        moved = index.pop(source, [])
+        for item in moved:
+            item['category'] = target
+        index.setdefault(target, []).extend(moved)
+
+    def _take(self, key: str, entry: Dict) -> List[Dict]:
+        """Pop the items an entry matches from the name index"""
+        same_name = self._index(key).get(entry['name'], [])
+        if 'repo' not in entry:
+            taken = same_name[:]
+            same_name.clear()
+        else:
+            taken = [i for i in same_name if i.get('repo') == entry['repo']]
+            same_name[:] = [i for i in same_name if i.get('repo') != entry['repo']]
+        return taken
+
+    def apply(self, entry: Dict):
+        op, item_type = entry.get('op'), entry.get('type')
+        if op == CHECKPOINT_OP:
+            return
+        if op == 'update_site':
+            self.config.setdefault('site', {}).update(entry.get('fields', {}))
+        elif op == 'add' and item_type == 'category':
+            category = entry['item']
+            if category not in self.config.setdefault('categories', []):
+                self.config['categories'].append(category)
+        elif op == 'remove' and item_type == 'category':
+            self.config['categories'] = [
+                c for c in self.config.get('categories', []) if c.get('id') != entry['name']
+            ]
+        elif op == 'rename' and item_type == 'category':
+            for category in self.config.get('categories', []):
+                if category.get('id') == entry['name']:
+                    category['id'] = entry['to']
+            self._move_items(entry['name'], entry['to'])
+        elif op == 'merge' and item_type == 'category':
+            if entry['into'] == entry['name']:
+                return
+            self._move_items(entry['name'], entry['into'])
+            self.config['categories'] = [
+                c for c in self.config.get('categories', []) if c.get('id') != entry['name']
+            ]
+        elif op == 'add' and item_type in ITEM_KEYS:
+            item = entry['item']
+            same_name = self._index(ITEM_KEYS[item_type]).setdefault(item.get('name'), [])
+            if item not in same_name:
+                same_name.append(item)
+                self.config[ITEM_KEYS[item_type]].append(item)
+                self.by_category = None
+        elif op == 'remove' and item_type in ITEM_KEYS:
+            for item in self._take(ITEM_KEYS[item_type], entry):
+                self.removed.add(id(item))
+            self.by_category = None
+        elif op == 'update' and item_type in ITEM_KEYS:
+            self.by_category = None
+            index = self._index(ITEM_KEYS[item_type])
+            for item in self._take(ITEM_KEYS[item_type], entry):
+                # In place, so the item keeps its position in the list
+                item.clear()
+                item.update(entry['item'])
+                index.setdefault(item.get('name'), []).append(item)
+        else:
+            raise ValueError(f"unknown journal entry: {entry!r}")
+
+    def finish(self) -> Dict:
+        if self.removed:
+            for key in ITEM_KEYS.values():
+                if key in self.by_name:
+                    self.config[key] = [i for i in self.config[key] if id(i) not in self.removed]
+            self.removed = set()
+        return self.config
+
+def replay(config: Dict, entries) -> Dict:
+    """Apply journal `entries` to `config` in place and return it"""
+    state = Replay(config)
+    for entry in entries:
+        state.apply(entry)
+    return state.finish()
@@ -0,0 +1,136 @@
+"""
+HF Site Builder - binary cache of the parsed config
+
+Parsing a large pretty-printed config.json dominates every builder.py
+command and app.py start. The parsed data is cached next to it in
+``.config.json.cache``: one JSON header line with the source's size,
+mtime and sha256, then the data in marshal format.
+
+A matching size and mtime is trusted as is. If only the mtime moved (a
+``touch`` or a fresh checkout), the source is hashed and the cache reused
+when the content is unchanged. On a miss the source is parsed with orjson
+when it is installed, plain json otherwise, and the cache rewritten.
+The cyclic garbage collector is paused while either builds the objects:
+its passes over millions of fresh dicts otherwise cost more than the
+parse itself.
+
+Writing the cache is best effort: on a read-only filesystem loads just
+fall back to parsing. Set HF_SITE_PARSE_CACHE=0 to bypass it.
+"""
+
+import gc
+import hashlib
+import json
+import marshal
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PARSE_CACHE_ENV = "HF_SITE_PARSE_CACHE"
+CACHE_FORMAT = 1
+
+def cache_path(path: Path) -> Path:
+    """Cache file for the JSON file at `path`"""
+    return path.with_name("." + path.name + ".cache")
+
+def enabled() -> bool:
+    return os.environ.get(PARSE_CACHE_ENV, "1") != "0"
+
+@contextmanager
+def gc_paused():
+    """Disable the cyclic GC for the block (JSON data has no cycles)"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def parse(raw: bytes):
+    """Parse JSON bytes with the fastest available parser"""
+    with gc_paused():
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+def _unmarshal(f):
+    # marshal.load() on a file reads object by object; one read is far faster
+    payload = f.read()
+    with gc_paused():
+        return marshal.loads(payload)
+
+def _header(stat, digest: str) -> dict:
+    return {
+        "format": CACHE_FORMAT,
+        "python": list(sys.version_info[:2]),
+        "marshal": marshal.version,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+    }
+
+def _write(path: Path, stat, digest: str, data):
+    cache = cache_path(path)
+    tmp_path = cache.with_name(cache.name + ".tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(_header(stat, digest)).encode('utf-8') + b"\n")
+            marshal.dump(data, f)
+        os.replace(tmp_path, cache)
+    except OSError:
+        # Read-only directory: just don't cache
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+    except ValueError:
+        # Not plain JSON data (e.g. compact Items): a bug in the caller
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def load_json(path: Path):
+    """Parse the JSON file at `path`, through the cache when it is valid"""
+    path = Path(path)
+    if not enabled():
+        return parse(path.read_bytes())
+
+    stat = path.stat()
+    raw = None
+    try:
+        with open(cache_path(path), 'rb') as f:
+            header = json.loads(f.readline())
+            expected = _header(stat, header.get('sha256'))
+            if header == expected:
+                return _unmarshal(f)
+            if {**header, "mtime_ns": stat.st_mtime_ns} == expected:
+                raw = path.read_bytes()
+                digest = hashlib.sha256(raw).hexdigest()
+                if digest == header['sha256']:
+                    data = _unmarshal(f)
+                    _write(path, stat, digest, data)
+                    return data
+    except (OSError, ValueError, EOFError, TypeError, AttributeError):
+        pass
+
+    if raw is None:
+        raw = path.read_bytes()
+    data = parse(raw)
+    _write(path, stat, hashlib.sha256(raw).hexdigest(), data)
+    return data
+
+def update(path: Path, text: str, data):
+    """Refresh the cache right after `text` (the serialized `data`) was
+    written to `path`, so the next load doesn't re-parse it
+
+    `data` must be plain JSON types (see `catalog.plain()`).
+    """
+    path = Path(path)
+    if enabled():
+        _write(path, path.stat(), hashlib.sha256(text.encode('utf-8')).hexdigest(), data)
@@ -0,0 +1,187 @@
+"""
+HF Site Builder - HTML rendering engine
+
+Card templates are f-strings compiled to bytecode once at import time, and
+every ``render_*`` function appends fragments to a caller supplied list so
+a whole page is produced with a single ``"".join``. All values coming from
+the config are HTML-escaped.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from html import escape
+
+# Bump whenever the card markup changes so cached fragments are invalidated
+TEMPLATE_VERSION = "1"
+
+SOCIAL_NETWORKS = (('github', 'GitHub'), ('twitter', 'Twitter'), ('linkedin', 'LinkedIn'))
+
+GRID_OPEN = "<div class='items-grid'>"
+GRID_CLOSE = "</div>"
+CATEGORIES_GRID_OPEN = "<div class='categories-grid'>"
+NO_ITEMS_HTML = "<p class='no-items'>No items in this category yet.</p>"
+
+# Entries per task in render_shards; large enough to amortize pickling
+PARALLEL_CHUNK_SIZE = 5000
+
+def _needs_escape(value):
+    """Return True if `value` contains any character HTML-escaping would touch"""
+    return '&' in value or '<' in value or '>' in value or '"' in value or "'" in value
+
+def _text(value):
+    """Escape a config value for use as element text"""
+    if not value:
+        return ''
+    value = str(value)
+    # Most values contain nothing to escape; membership tests are far cheaper
+    # than html.escape's unconditional replace() calls
+    if '&' in value or '<' in value or '>' in value:
+        return escape(value, quote=False)
+    return value
+
+def _attr(value):
+    """Escape a config value for use inside a quoted attribute"""
+    value = str(value)
+    return escape(value, quote=True) if _needs_escape(value) else value
+
+def render_category_card(out, category):
+    """Append the HTML for a category card to `out`"""
+    out.append(f"""
+    <div class="category-card">
+        <div class="category-icon">{_text(category['icon'])}</div>
+        <h3>{_text(category['name'])}</h3>
+        <p>{_text(category['description'])}</p>
+    </div>
+    """)
+
+def render_item_card(out, item, item_type="model"):
+    """Append the HTML for a model or dataset card to `out`"""
+    get = item.get
+    name = item['name']
+    description = get('description') or ''
+    tags = get('tags') or ()
+    repo = get('repo')
+    demo_url = get('demo_url')
+    paper_url = get('paper_url')
+    size = get('size')
+
+    # Fast path: probe every field at once and skip per-field escaping for
+    # the (typical) card that has nothing to escape
+    if _needs_escape(f"{name}{description}{repo}{demo_url}{paper_url}{size}{''.join(map(str, tags))}"):
+        name = _text(name)
+        description = _text(description)
+        tags = [_text(tag) for tag in tags]
+        repo = repo and _attr(repo)
+        demo_url = demo_url and _attr(demo_url)
+        paper_url = paper_url and _attr(paper_url)
+        size = size and _text(size)
+
+    tags_html = " ".join([f'<span class="tag">{tag}</span>' for tag in tags])
+
+    links = []
+    if repo:
+        links.append(f'<a href="https://huggingface.co/{repo}" target="_blank" class="card-link">🤗 View on HF</a>')
+    if demo_url:
+        links.append(f'<a href="{demo_url}" target="_blank" class="card-link">🚀 Demo</a>')
+    if paper_url:
+        links.append(f'<a href="{paper_url}" target="_blank" class="card-link">📄 Paper</a>')
+
+    size_info = f'<div class="card-size">{size}</div>' if size else ''
+
+    out.append(f"""
+    <div class="item-card">
+        <h3>{name}</h3>
+        <p class="card-description">{description}</p>
+        {size_info}
+        <div class="card-tags">{tags_html}</div>
+        <div class="card-links">{" ".join(links)}</div>
+    </div>
+    """)
+
+def render_header(out, site):
+    """Append the site header to `out`"""
+    social = site.get('social_links') or {}
+    social_html = " · ".join([
+        f'<a href="{_attr(social[key])}" target="_blank">{label}</a>'
+        for key, label in SOCIAL_NETWORKS if social.get(key)
+    ])
+
+    out.append(f"""
+    <div class="site-header">
+        <h1>{_text(site['title'])}</h1>
+        <p class="site-description">{_text(site['description'])}</p>
+        <p class="site-author">by {_text(site['author'])}</p>
+        <div class="social-links">{social_html}</div>
+    </div>
+    """)
+
+def render_items_grid(out, models, datasets, render_card=render_item_card):
+    """Append an items grid with the given models and datasets to `out`
+
+    `render_card` defaults to `render_item_card`; pass e.g. a
+    `FragmentCache.render_item_card` to reuse cached fragments.
+    """
+    out.append(GRID_OPEN)
+    for model in models:
+        render_card(out, model, "model")
+    for dataset in datasets:
+        render_card(out, dataset, "dataset")
+    out.append(GRID_CLOSE)
+
+def render_entries_grid(out, entries, render_card=render_item_card):
+    """Append an items grid for a sequence of ``(item, item_type)`` pairs"""
+    out.append(GRID_OPEN)
+    for item, item_type in entries:
+        render_card(out, item, item_type)
+    out.append(GRID_CLOSE)
+
+def render_categories_grid(out, categories):
+    """Append the categories overview grid to `out`"""
+    out.append(CATEGORIES_GRID_OPEN)
+    for category in categories:
+        render_category_card(out, category)
+    out.append(GRID_CLOSE)
+
+def to_html(render, *args):
+    """Run a ``render_*`` function and return its output as one string"""
+    out = []
+    render(out, *args)
+    return "".join(out)
+
+def _render_chunk(entries):
+    """Render ``(item, item_type)`` pairs to one string (runs in a worker)"""
+    out = []
+    for item, item_type in entries:
+        render_item_card(out, item, item_type)
+    return "".join(out)
+
+def _gil_disabled():
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+def render_shards(shards, workers, chunk_size=PARALLEL_CHUNK_SIZE):
+    """Render the cards of several entry lists in parallel
+
+    `shards` is a list of ``(item, item_type)`` lists (e.g. one per
+    category). Every shard is cut into chunks of `chunk_size` entries, the
+    chunks are rendered by `workers` processes (threads on free-threaded
+    Python) and reassembled in order, so the result - one string of card
+    HTML per shard - is byte-identical to rendering serially.
+    """
+    chunks, owners = [], []
+    for shard_number, entries in enumerate(shards):
+        for start in range(0, len(entries), chunk_size):
+            chunks.append(entries[start:start + chunk_size])
+            owners.append(shard_number)
+
+    if workers <= 1 or len(chunks) <= 1:
+        rendered = map(_render_chunk, chunks)
+    else:
+        executor_class = ThreadPoolExecutor if _gil_disabled() else ProcessPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            rendered = list(executor.map(_render_chunk, chunks))
+
+    results = [[] for _ in shards]
+    for shard_number, html in zip(owners, rendered):
+        results[shard_number].append(html)
+    return ["".join(parts) for parts in results]
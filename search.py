@@ -0,0 +1,310 @@
+"""
+HF Site Builder - in-memory inverted index for searching the catalog
+
+The index is built once per config from ``config['models']`` and
+``config['datasets']``: ``name`` and ``description`` are tokenized, ``tags``
+are indexed exactly. Queries are ANDed and answered with set intersections
+that start from the rarest term, so query cost follows the size of the
+smallest posting list rather than the size of the catalog.
+
+Posting lists that hold more than 1/`DENSE_FRACTION` of the items (common
+words and tags) are stored as bitsets - Python ints with bit ``id`` set -
+instead: ANDing two of them is a single C-level pass where intersecting
+sets of that size probes every id, and they take less memory. A query's
+match set is either a set of ids or such a bitset, and is kept for the
+next call, so `search()` and `facets()` for the same query compute it once.
+"""
+
+import heapq
+import re
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate, chain, count, islice
+from operator import add
+
+from parse_cache import gc_paused
+
+TOKEN_RE = re.compile(r"\w+")
+TAG_PREFIX = "tag:"
+# Posting lists with at least len(entries) / DENSE_FRACTION ids are bitsets
+DENSE_FRACTION = 256
+# Facets of matches up to len(entries) / FACET_COUNT_FRACTION are counted
+# item by item; bigger ones tag by tag, with bitsets
+FACET_COUNT_FRACTION = 16
+# Checking a sparse tag's ids against the matches costs about 1/SPARSE_TAG_COST
+# of counting one matched item's tags
+SPARSE_TAG_COST = 16
+NONZERO_BYTE_RE = re.compile(rb"[^\x00]")
+# Bit positions set in each byte value, lowest first
+BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+def parse_query(query):
+    """Split a query string into (terms, tags)
+
+    ``tag:<name>`` selects an exact tag; everything else is tokenized into
+    terms. Example: ``"text classifier tag:bert"``.
+    """
+    terms, tags = [], []
+    for word in (query or "").split():
+        if word.lower().startswith(TAG_PREFIX):
+            if len(word) > len(TAG_PREFIX):
+                tags.append(word[len(TAG_PREFIX):])
+        else:
+            terms.extend(tokenize(word))
+    return terms, tags
+
+def _text(value):
+    """A name or description as text: like the renderer, empty values are
+    skipped and anything that isn't a string is stringified"""
+    return value if not value or type(value) is str else str(value)
+
+def _tags(value) -> tuple:
+    """An item's tags as a tuple of strings, stringified like `_text`"""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    if not isinstance(value, (list, tuple)):
+        return ()
+    return tuple(tag if type(tag) is str else str(tag) for tag in value if tag)
+
+def _facet_order(facet):
+    tag, count = facet
+    return -count, tag
+
+def _size(ids) -> int:
+    return ids.bit_count() if type(ids) is int else len(ids)
+
+def _bit_chars(bits, length) -> str:
+    """Bitset `bits` as a string of "0"/"1", indexed by id"""
+    return bin(bits)[:1:-1].ljust(length, "0")
+
+def _bit_ids(bits) -> list:
+    """The ids set in bitset `bits`, ascending"""
+    gaps = bin(bits)[:1:-1].split("1")
+    gaps.pop()
+    # The n-th set bit follows n earlier ones and the zeros before it
+    return list(map(add, accumulate(map(len, gaps)), count()))
+
+class SearchIndex:
+    """Inverted index over models and datasets
+
+    `entries` is the list of ``(item, item_type)`` pairs that result ids
+    refer to (models first, then datasets, in config order). Posting lists
+    (``terms``, ``name_terms``, ``tags``) are sets of ids, or bitsets for
+    the dense ones.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.terms = {}        # token -> ids whose name or description contains it
+        self.name_terms = {}   # token -> ids whose name contains it
+        self.tags = {}         # exact tag -> ids
+        self.item_tags = []    # id -> tuple of tags, for facets
+        self._nbytes = (len(entries) + 7) // 8
+        self._last = None      # (query, matches, in_name) of the last query
+
+        terms, name_terms, tags, item_tags = self.terms, self.name_terms, self.tags, self.item_tags
+        shared_tags = {}
+        with gc_paused():
+            for item_id, (item, _) in enumerate(entries):
+                name_tokens = set(tokenize(_text(item.get('name'))))
+                for token in name_tokens:
+                    ids = name_terms.get(token)
+                    if ids is None:
+                        ids = name_terms[token] = set()
+                    ids.add(item_id)
+                for token in name_tokens.union(tokenize(_text(item.get('description')))):
+                    ids = terms.get(token)
+                    if ids is None:
+                        ids = terms[token] = set()
+                    ids.add(item_id)
+                item_tag_tuple = _tags(item.get('tags'))
+                for tag in item_tag_tuple:
+                    ids = tags.get(tag)
+                    if ids is None:
+                        ids = tags[tag] = set()
+                    ids.add(item_id)
+                # Many items share a tag combination: keep one tuple of each
+                item_tags.append(shared_tags.setdefault(item_tag_tuple, item_tag_tuple))
+            for postings in (terms, name_terms, tags):
+                self._densify(postings)
+        # Tags by descending number of items, with their negated sizes and
+        # running totals of the sizes, for pruning facet counts
+        self._tags_by_size = sorted(tags, key=lambda tag: _size(tags[tag]), reverse=True)
+        self._tag_sizes = [-_size(tags[tag]) for tag in self._tags_by_size]
+        self._tag_size_sums = list(accumulate(self._tag_sizes, lambda total, size: total - size, initial=0))
+
+    def _densify(self, postings):
+        """Replace the dense posting sets with bitsets"""
+        threshold = max(1, len(self.entries) // DENSE_FRACTION)
+        for key, ids in postings.items():
+            if len(ids) >= threshold:
+                bits = bytearray(self._nbytes)
+                for item_id in ids:
+                    bits[item_id >> 3] |= 1 << (item_id & 7)
+                postings[key] = int.from_bytes(bits, 'little')
+
+    @classmethod
+    def from_config(cls, config):
+        """Build an index over every model and dataset in `config`"""
+        return cls(
+            [(m, "model") for m in config.get('models', [])] +
+            [(d, "dataset") for d in config.get('datasets', [])]
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _intersect(self, postings):
+        """Ids in every one of `postings` (sets or bitsets): a set when any
+        is a set, else a bitset; may be one of the index's own postings"""
+        sets = [ids for ids in postings if type(ids) is not int]
+        bitsets = [ids for ids in postings if type(ids) is int]
+        bits = None
+        if bitsets:
+            bits = bitsets[0]
+            for other in bitsets[1:]:
+                bits &= other
+        if not sets:
+            return bits
+        sets.sort(key=len)
+        result = sets[0] if len(sets) == 1 else sets[0].intersection(*sets[1:])
+        if bits is None or not result:
+            return result
+        data = bits.to_bytes(self._nbytes, 'little')
+        return {item_id for item_id in result if data[item_id >> 3] >> (item_id & 7) & 1}
+
+    def match(self, terms=(), tags=(), name_only=False):
+        """Return the ids matching every term and every tag
+
+        With `name_only`, terms must appear in the item name. The result is
+        a set or a bitset (see the module docstring) and may be one of the
+        index's own postings; treat it as read-only.
+        """
+        term_postings = self.name_terms if name_only else self.terms
+        postings = []
+        for term in terms:
+            postings.append(term_postings.get(term.lower(), ()))
+        for tag in tags:
+            postings.append(self.tags.get(tag, ()))
+        if not postings or not all(postings):
+            return set()
+        return self._intersect(postings)
+
+    def _query(self, query):
+        """``(matches, in_name)`` for `query`, remembered for the next call"""
+        last = self._last
+        if last is not None and last[0] == query:
+            return last[1], last[2]
+        terms, tags = parse_query(query)
+        matches = self.match(terms, tags)
+        in_name = matches
+        if terms and _size(matches):
+            # Matches whose name has every term; name tokens are a subset
+            # of the indexed terms, so this only narrows `matches`
+            name_postings = [self.name_terms.get(term, ()) for term in terms]
+            in_name = self._intersect([matches] + name_postings) if all(name_postings) else set()
+        self._last = (query, matches, in_name)
+        return matches, in_name
+
+    def _in_order(self, ids, exclude=()):
+        """Yield `ids` (minus `exclude`) in ascending order, lazily
+
+        Bitsets are scanned a nonzero byte at a time. Dense sets are walked
+        by probing ``range(len(entries))``, which reaches the first few hits
+        without looking at the rest; sparse sets are simply sorted.
+        """
+        if type(ids) is int:
+            data = ids.to_bytes(self._nbytes, 'little')
+            for found in NONZERO_BYTE_RE.finditer(data):
+                start = found.start()
+                for bit in BYTE_BITS[data[start]]:
+                    item_id = start * 8 + bit
+                    if item_id not in exclude:
+                        yield item_id
+        elif len(ids) * len(ids) > len(self.entries) * 64:
+            for item_id in range(len(self.entries)):
+                if item_id in ids and item_id not in exclude:
+                    yield item_id
+        else:
+            for item_id in sorted(ids):
+                if item_id not in exclude:
+                    yield item_id
+
+    def search(self, query, limit=50, offset=0):
+        """Run an AND query and return ``(total, [(item, item_type), ...])``
+
+        Results whose name contains every term rank first; ties keep config
+        order. Only the first ``offset + limit`` results are ever ordered.
+        """
+        matches, in_name = self._query(query)
+        total = _size(matches)
+        if not total:
+            return 0, []
+
+        wanted = offset + limit
+        ranked = list(islice(self._in_order(in_name), wanted))
+        in_name_size = _size(in_name)
+        if len(ranked) < wanted and in_name_size < total:
+            if type(matches) is int and type(in_name) is int:
+                rest = self._in_order(matches ^ in_name)  # in_name is a subset
+            else:
+                rest = self._in_order(matches, exclude=in_name)
+            ranked.extend(islice(rest, wanted - len(ranked)))
+
+        return total, [self.entries[i] for i in ranked[offset:wanted]]
+
+    def facets(self, query, top=10):
+        """Return the `top` most common tags among the results of `query`
+
+        Ties go to the alphabetically first tag.
+        """
+        matches, _ = self._query(query)
+        total = _size(matches)
+        if not total or top <= 0:
+            return []
+        if type(matches) is int:
+            if total * FACET_COUNT_FRACTION > len(self.entries):
+                best = self._facets_by_tag(matches, total, top)
+                if best is not None:
+                    return best
+            ids = _bit_ids(matches)
+        else:
+            ids = matches
+        counts = Counter(chain.from_iterable(map(self.item_tags.__getitem__, ids)))
+        return heapq.nsmallest(top, counts.items(), key=_facet_order)
+
+    def _facets_by_tag(self, matches, total, top):
+        """Count tags among the bitset `matches` tag by tag, biggest first,
+        until no remaining tag has enough items to make the top
+
+        Returns None when the sparse tags left to check would cost more
+        than counting the matches item by item.
+        """
+        best = []
+        bit_chars = None
+        for rank, tag in enumerate(self._tags_by_size):
+            ids = self.tags[tag]
+            floor = best[-1][1] if len(best) == top else 1
+            if _size(ids) < floor:
+                break
+            if type(ids) is int:
+                tag_count = (ids & matches).bit_count()
+            else:
+                if bit_chars is None:
+                    # Sorted by size, so every tag from here on is sparse
+                    last = bisect_right(self._tag_sizes, -floor)
+                    if self._tag_size_sums[last] - self._tag_size_sums[rank] > total * SPARSE_TAG_COST:
+                        return None
+                    bit_chars = _bit_chars(matches, len(self.entries))
+                tag_count = list(map(bit_chars.__getitem__, ids)).count("1")
+            if tag_count:
+                best.append((tag, tag_count))
+                best.sort(key=_facet_order)
+                del best[top:]
+        return best
@@ -0,0 +1,797 @@
+"""
+HF Site Builder - config storage backends
+
+Three on-disk layouts are supported and picked automatically by
+`open_storage()`:
+
+* ``config.json`` - the original single file.
+* ``config.d/`` - a sharded layout next to it: ``site.json``,
+  ``categories.json`` and one file per category holding that category's
+  models and datasets, tied together by ``manifest.json``. Saving rewrites
+  only the shards whose content changed, then the manifest.
+* ``config.db`` - a SQLite database with items indexed by name, category
+  and tag; edits are applied in place, one transaction per batch.
+
+All expose the same ``exists() / load() / save(config)`` interface, so
+builder.py, builder_gui.py and app.py don't care which one is in use, plus
+``append(entry) / apply(entries)`` for mutation entries (see journal.py)
+and ``site() / categories() / count() / category_counts() / iter_items() /
+find()`` for read-only queries. `open_storage()` wraps the two file
+layouts in a `JournaledStorage`, which journals mutations and replays
+them on load.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import parse_cache
+from catalog import plain, to_json
+from journal import ITEM_KEYS, MutationJournal, checkpoint_entry, journal_path, pending_entries, replay
+
+try:
+    import sqlite3
+except ImportError:  # Python built without SQLite
+    sqlite3 = None
+
+SHARDED_DIR_SUFFIX = ".d"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = "hf-site-builder/sharded"
+MANIFEST_VERSION = 1
+LAYOUTS = ("json", "sharded", "sqlite")
+# Compact automatically once the journal grows past this many bytes
+JOURNAL_COMPACT_BYTES = int(os.environ.get("HF_SITE_JOURNAL_COMPACT_BYTES", 1 << 20))
+
+def dump_json(data) -> str:
+    """Serialize config data the way config.json has always been written"""
+    return json.dumps(data, indent=2, ensure_ascii=False, default=to_json)
+
+def write_atomic(path: Path, text: str):
+    """Write `text` to `path` via a temp file, fsync and rename"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def backup_path(path: Path) -> Path:
+    return path.with_name(path.name + ".bak")
+
+def remove_path(path: Path):
+    """Delete a file or a directory tree, if it exists"""
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+def move_aside(path: Path):
+    """Move `path` to its ``.bak``, replacing an older backup"""
+    remove_path(backup_path(path))
+    os.replace(path, backup_path(path))
+
+def iter_config_items(config: Dict, item_types=tuple(ITEM_KEYS), name=None, category=None, tag=None) -> Iterator[Tuple[str, Dict]]:
+    """Yield ``(item type, item)`` for the items of `item_types` matching
+    every given filter, models before datasets"""
+    for item_type in item_types:
+        for item in config.get(ITEM_KEYS[item_type], []):
+            if (
+                (name is None or item.get('name') == name)
+                and (category is None or item.get('category') == category)
+                and (tag is None or tag in (item.get('tags') or []))
+            ):
+                yield item_type, item
+
+def find_in_config(config: Dict, item_type: str, name=None, category=None, tag=None) -> List[Dict]:
+    """Items of `item_type` ('model', 'dataset' or 'category') matching every
+    given filter; for categories `name` is the id"""
+    if item_type == "category":
+        return [c for c in config.get('categories', []) if name is None or c.get('id') == name]
+    return [item for _, item in iter_config_items(config, (item_type,), name, category, tag)]
+
+def count_categories(config: Dict) -> Dict[str, int]:
+    """Number of models and datasets per category id (one pass)"""
+    counts = {}
+    for key in ITEM_KEYS.values():
+        for item in config.get(key, []):
+            category = item.get('category')
+            if not isinstance(category, (list, dict)):
+                counts[category] = counts.get(category, 0) + 1
+    return counts
+
+class JsonStorage:
+    """The original single-file layout"""
+
+    kind = "json"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @property
+    def watch_path(self) -> Path:
+        """File whose mtime changes on every save"""
+        return self.path
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> Dict:
+        """Parse the file, through the binary parse cache (see parse_cache.py)"""
+        return parse_cache.load_json(self.path)
+
+    def save(self, config: Dict) -> List[Path]:
+        """Write the whole config; returns the files written"""
+        text = dump_json(config)
+        write_atomic(self.path, text)
+        parse_cache.update(self.path, text, plain(config))
+        return [self.path]
+
+    def backup(self):
+        """Move the config aside to ``config.json.bak``"""
+        move_aside(self.path)
+        parse_cache.cache_path(self.path).unlink(missing_ok=True)
+
+    def restore(self):
+        """Undo `backup()`"""
+        os.replace(backup_path(self.path), self.path)
+
+    def discard(self):
+        """Delete the config (a migration target that failed)"""
+        remove_path(self.path)
+        parse_cache.cache_path(self.path).unlink(missing_ok=True)
+
+def category_slug(category_id) -> str:
+    """File-name-safe name for a category id; the hash keeps ids that
+    sanitize to the same string apart"""
+    slug = re.sub(r'[^A-Za-z0-9_-]', '-', str(category_id))[:48]
+    digest = hashlib.sha1(json.dumps(category_id).encode('utf-8')).hexdigest()[:8]
+    return f"{slug}-{digest}"
+
+class ShardedStorage:
+    """Per-category shard files plus a manifest, in ``<config>.d/``
+
+    The manifest lists every file with the sha256 of its content. `save()`
+    serializes each part, compares it with the manifest and only writes the
+    files that differ. Every file is replaced atomically and the manifest
+    is written last, so readers never see a half-written file.
+
+    Items are stored by category, so the manifest also records their
+    original order as runs of ``[shard index, item count]`` per list::
+
+        "order": {"models": [[0, 120], [2, 1], [0, 5]], "datasets": [[1, 40]]}
+
+    and `load()` interleaves the shards back into it.
+    """
+
+    kind = "sharded"
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / MANIFEST_NAME
+
+    @property
+    def watch_path(self) -> Path:
+        """File whose mtime changes on every save (the manifest)"""
+        return self.manifest_path
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def read_manifest(self) -> Optional[Dict]:
+        if not self.manifest_path.exists():
+            return None
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != MANIFEST_FORMAT:
+            raise ValueError(f"{self.manifest_path} is not a sharded config manifest")
+        return manifest
+
+    def _read(self, name: str):
+        return parse_cache.parse((self.directory / name).read_bytes())
+
+    def load(self) -> Dict:
+        manifest = self.read_manifest()
+        if manifest is None:
+            raise FileNotFoundError(self.manifest_path)
+
+        config = {
+            "site": self._read(manifest['site']['file']),
+            "categories": self._read(manifest['categories']['file']),
+            "models": [],
+            "datasets": [],
+        }
+        shards = [self._read(shard['file']) for shard in manifest['shards']]
+        order = manifest.get('order') or {}
+        for key in ('models', 'datasets'):
+            remaining = [iter(items.get(key, [])) for items in shards]
+            for shard_index, count in order.get(key, []):
+                config[key].extend(itertools.islice(remaining[shard_index], count))
+            # Without an order (older manifests), or items it doesn't cover
+            for items in remaining:
+                config[key].extend(items)
+        return config
+
+    @staticmethod
+    def shard_file_name(category_id) -> str:
+        """File name for a category shard"""
+        return f"items/{category_slug(category_id)}.json"
+
+    @staticmethod
+    def split(config: Dict) -> Tuple[Dict[str, object], List[Tuple[object, str]], Dict[str, List[List[int]]]]:
+        """Split a config into ``{file name: data}`` for every part
+
+        Also returns the ``(category id, file name)`` pairs of the item
+        shards and the manifest's item order (see the class docstring).
+        """
+        parts = {
+            "site.json": config.get('site', {}),
+            "categories.json": config.get('categories', []),
+        }
+        # Shards follow category order; items whose category is unknown
+        # still get a shard, in order of first appearance
+        shards = {c.get('id'): {"models": [], "datasets": []} for c in config.get('categories', [])}
+        runs = {}
+        for key in ('models', 'datasets'):
+            key_runs = runs[key] = []
+            for item in config.get(key, []):
+                shard = shards.get(item.get('category'))
+                if shard is None:
+                    shard = shards[item.get('category')] = {"models": [], "datasets": []}
+                shard[key].append(item)
+                if key_runs and key_runs[-1][0] is shard:
+                    key_runs[-1][1] += 1
+                else:
+                    key_runs.append([shard, 1])
+        shard_list, shard_index = [], {}
+        for category_id, items in shards.items():
+            if items['models'] or items['datasets']:
+                name = ShardedStorage.shard_file_name(category_id)
+                parts[name] = items
+                shard_index[id(items)] = len(shard_list)
+                shard_list.append((category_id, name))
+        order = {key: [[shard_index[id(shard)], count] for shard, count in key_runs] for key, key_runs in runs.items()}
+        return parts, shard_list, order
+
+    def save(self, config: Dict) -> List[Path]:
+        """Write the shards whose content changed, then the manifest
+
+        Returns the files written.
+        """
+        manifest = self.read_manifest() or {}
+        old_hashes = {
+            entry['file']: entry.get('sha256')
+            for entry in [manifest.get('site'), manifest.get('categories')] + manifest.get('shards', [])
+            if entry
+        }
+
+        parts, shard_list, order = self.split(config)
+        (self.directory / "items").mkdir(parents=True, exist_ok=True)
+
+        written, hashes = [], {}
+        for name, data in parts.items():
+            text = dump_json(data)
+            digest = content_hash(text)
+            hashes[name] = digest
+            if old_hashes.get(name) != digest or not (self.directory / name).exists():
+                write_atomic(self.directory / name, text)
+                written.append(self.directory / name)
+
+        new_manifest = {
+            "format": MANIFEST_FORMAT,
+            "version": MANIFEST_VERSION,
+            "site": {"file": "site.json", "sha256": hashes["site.json"]},
+            "categories": {"file": "categories.json", "sha256": hashes["categories.json"]},
+            "shards": [
+                {
+                    "category": category_id,
+                    "file": name,
+                    "sha256": hashes[name],
+                    "models": len(parts[name]['models']),
+                    "datasets": len(parts[name]['datasets']),
+                }
+                for category_id, name in shard_list
+            ],
+            "order": order,
+        }
+        if written or new_manifest != manifest:
+            write_atomic(self.manifest_path, dump_json(new_manifest))
+            written.append(self.manifest_path)
+
+        # Shards of categories that no longer have items
+        for name in set(old_hashes) - set(parts):
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+        return written
+
+    def backup(self):
+        """Move the directory aside to ``config.d.bak/``"""
+        move_aside(self.directory)
+
+    def restore(self):
+        """Undo `backup()`"""
+        os.replace(backup_path(self.directory), self.directory)
+
+    def discard(self):
+        """Delete the directory (a migration target that failed)"""
+        remove_path(self.directory)
+
+# Stored in PRAGMA user_version once the schema below exists
+SQLITE_SCHEMA_VERSION = 1
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS site (id INTEGER PRIMARY KEY CHECK (id = 0), data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS categories (seq INTEGER PRIMARY KEY, id, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS categories_id ON categories (id);
+CREATE TABLE IF NOT EXISTS items (
+    seq INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    name,
+    repo,
+    category,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_name ON items (type, name);
+CREATE INDEX IF NOT EXISTS items_category ON items (category);
+CREATE TABLE IF NOT EXISTS item_tags (
+    item INTEGER NOT NULL REFERENCES items (seq) ON DELETE CASCADE,
+    tag NOT NULL
+);
+CREATE INDEX IF NOT EXISTS item_tags_tag ON item_tags (tag);
+CREATE INDEX IF NOT EXISTS item_tags_item ON item_tags (item);
+"""
+
+def _column(value):
+    """Scalar for an indexed column (malformed lists/dicts are stored as JSON)"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+class SqliteStorage:
+    """The config in a SQLite database, ``config.db`` next to config.json
+
+    Each category and item is a row holding its JSON, ordered by ``seq``
+    so `load()` returns the config exactly as saved. Name, repo and
+    category are indexed columns and tags live in ``item_tags``, so
+    `find()` never loads the whole catalog. Mutations are applied directly,
+    one transaction per `apply()` call, so there is no journal.
+    """
+
+    kind = "sqlite"
+    journal = None
+
+    def __init__(self, path: Path):
+        if sqlite3 is None:
+            raise RuntimeError("SQLite storage needs Python's sqlite3 module")
+        self.path = Path(path)
+
+    @property
+    def watch_path(self) -> Path:
+        """File whose mtime changes on every commit"""
+        return self.path
+
+    @property
+    def watch_paths(self) -> List[Path]:
+        return [self.path]
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @contextmanager
+    def transaction(self):
+        """Connection whose changes commit together when the block exits,
+        or roll back if it raises"""
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("PRAGMA foreign_keys = ON")
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            if version < SQLITE_SCHEMA_VERSION:
+                self._create_schema(conn)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _create_schema(conn):
+        """Create the tables in a new database, in a transaction of its own
+
+        (executescript() commits whatever is pending, so this must never
+        run inside another transaction.)
+        """
+        conn.executescript(
+            f"BEGIN IMMEDIATE;{SQLITE_SCHEMA}PRAGMA user_version = {SQLITE_SCHEMA_VERSION};COMMIT;"
+        )
+
+    def load(self) -> Dict:
+        if not self.exists():
+            raise FileNotFoundError(self.path)
+        with self.transaction() as conn:
+            row = conn.execute("SELECT data FROM site").fetchone()
+            config = {
+                "site": json.loads(row[0]) if row else {},
+                "categories": [json.loads(data) for (data,) in conn.execute("SELECT data FROM categories ORDER BY seq")],
+                "models": [],
+                "datasets": [],
+            }
+            for item_type, data in conn.execute("SELECT type, data FROM items ORDER BY seq"):
+                config[ITEM_KEYS[item_type]].append(json.loads(data))
+        return config
+
+    @staticmethod
+    def _item_columns(item: Dict) -> Tuple:
+        return (
+            _column(item.get('name')), _column(item.get('repo')),
+            _column(item.get('category')), json.dumps(item, ensure_ascii=False, default=to_json),
+        )
+
+    @staticmethod
+    def _tag_rows(seq: int, item: Dict) -> List[Tuple]:
+        return [(seq, tag) for tag in dict.fromkeys(map(_column, item.get('tags') or []))]
+
+    @classmethod
+    def _insert_items(cls, conn, rows):
+        """Insert ``(type, item)`` pairs and their tags"""
+        (last_seq,) = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM items").fetchone()
+        item_rows, tag_rows = [], []
+        for seq, (item_type, item) in enumerate(rows, last_seq + 1):
+            item_rows.append((seq, item_type, *cls._item_columns(item)))
+            tag_rows.extend(cls._tag_rows(seq, item))
+        conn.executemany("INSERT INTO items (seq, type, name, repo, category, data) VALUES (?, ?, ?, ?, ?, ?)", item_rows)
+        conn.executemany("INSERT INTO item_tags (item, tag) VALUES (?, ?)", tag_rows)
+
+    @staticmethod
+    def _match(entry: Dict) -> Tuple[str, List]:
+        """WHERE clause for the items a remove/update entry matches"""
+        sql, params = "type = ? AND name IS ?", [entry['type'], _column(entry['name'])]
+        if 'repo' in entry:
+            sql += " AND repo IS ?"
+            params.append(_column(entry['repo']))
+        return sql, params
+
+    @staticmethod
+    def _move_items(conn, source, target):
+        """Point every item in category `source` at `target`, through the category index"""
+        rows = conn.execute("SELECT seq, data FROM items WHERE category = ?", (_column(source),)).fetchall()
+        updates = []
+        for seq, data in rows:
+            item = json.loads(data)
+            item['category'] = target
+            updates.append((_column(target), json.dumps(item, ensure_ascii=False), seq))
+        conn.executemany("UPDATE items SET category = ?, data = ? WHERE seq = ?", updates)
+
+    @staticmethod
+    def _write_site(conn, site: Dict):
+        conn.execute("INSERT OR REPLACE INTO site (id, data) VALUES (0, ?)", (json.dumps(site, ensure_ascii=False),))
+
+    @staticmethod
+    def _insert_category(conn, category: Dict):
+        conn.execute(
+            "INSERT INTO categories (id, data) VALUES (?, ?)",
+            (_column(category.get('id')), json.dumps(category, ensure_ascii=False)),
+        )
+
+    def save(self, config: Dict) -> List[Path]:
+        """Replace the whole config in one transaction"""
+        with self.transaction() as conn:
+            for table in ("item_tags", "items", "categories", "site"):
+                conn.execute(f"DELETE FROM {table}")
+            self._write_site(conn, config.get('site', {}))
+            for category in config.get('categories', []):
+                self._insert_category(conn, category)
+            self._insert_items(conn, (
+                (item_type, item)
+                for item_type, key in ITEM_KEYS.items()
+                for item in config.get(key, [])
+            ))
+        return [self.path]
+
+    def apply(self, entries: List[Dict]):
+        """Apply mutation entries (same format as the journal's) in one transaction"""
+        with self.transaction() as conn:
+            for entry in entries:
+                op, item_type = entry.get('op'), entry.get('type')
+                if op == 'update_site':
+                    row = conn.execute("SELECT data FROM site").fetchone()
+                    site = json.loads(row[0]) if row else {}
+                    site.update(entry.get('fields', {}))
+                    self._write_site(conn, site)
+                elif op == 'add' and item_type == 'category':
+                    self._insert_category(conn, entry['item'])
+                elif op == 'remove' and item_type == 'category':
+                    conn.execute("DELETE FROM categories WHERE id = ?", (_column(entry['name']),))
+                elif op in ('rename', 'merge') and item_type == 'category':
+                    target = entry['to'] if op == 'rename' else entry['into']
+                    if target == entry['name']:
+                        continue
+                    self._move_items(conn, entry['name'], target)
+                    if op == 'rename':
+                        for seq, data in conn.execute("SELECT seq, data FROM categories WHERE id = ?", (_column(entry['name']),)).fetchall():
+                            category = {**json.loads(data), "id": target}
+                            conn.execute(
+                                "UPDATE categories SET id = ?, data = ? WHERE seq = ?",
+                                (_column(target), json.dumps(category, ensure_ascii=False), seq),
+                            )
+                    else:
+                        conn.execute("DELETE FROM categories WHERE id = ?", (_column(entry['name']),))
+                elif op == 'add' and item_type in ITEM_KEYS:
+                    self._insert_items(conn, [(item_type, entry['item'])])
+                elif op == 'remove' and item_type in ITEM_KEYS:
+                    where, params = self._match(entry)
+                    conn.execute(f"DELETE FROM items WHERE {where}", params)
+                elif op == 'update' and item_type in ITEM_KEYS:
+                    where, params = self._match(entry)
+                    item = entry['item']
+                    for (seq,) in conn.execute(f"SELECT seq FROM items WHERE {where}", params).fetchall():
+                        conn.execute(
+                            "UPDATE items SET name = ?, repo = ?, category = ?, data = ? WHERE seq = ?",
+                            (*self._item_columns(item), seq),
+                        )
+                        conn.execute("DELETE FROM item_tags WHERE item = ?", (seq,))
+                        conn.executemany("INSERT INTO item_tags (item, tag) VALUES (?, ?)", self._tag_rows(seq, item))
+                else:
+                    raise ValueError(f"unknown mutation entry: {entry!r}")
+
+    def append(self, entry: Dict) -> Path:
+        """Apply one mutation; returns the file it went to"""
+        self.apply([entry])
+        return self.path
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def compact(self) -> List[Path]:
+        return []
+
+    def site(self) -> Dict:
+        if not self.exists():
+            raise FileNotFoundError(self.path)
+        with self.transaction() as conn:
+            row = conn.execute("SELECT data FROM site").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def categories(self) -> List[Dict]:
+        return self.find("category")
+
+    def count(self, item_type: str) -> int:
+        if not self.exists():
+            return 0
+        with self.transaction() as conn:
+            return conn.execute("SELECT COUNT(*) FROM items WHERE type = ?", (item_type,)).fetchone()[0]
+
+    def category_counts(self) -> Dict[str, int]:
+        """Items per category id, from the category index alone"""
+        if not self.exists():
+            return {}
+        with self.transaction() as conn:
+            return dict(conn.execute("SELECT category, COUNT(*) FROM items GROUP BY category"))
+
+    def iter_items(self, item_types=tuple(ITEM_KEYS), name=None, category=None, tag=None) -> Iterator[Tuple[str, Dict]]:
+        """Stream matching items from the database through the indexes;
+        same order and filters as `iter_config_items()`"""
+        if not self.exists():
+            return
+        sql, params = "SELECT type, data FROM items WHERE type = ?", []
+        if name is not None:
+            sql += " AND name = ?"
+            params.append(_column(name))
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(_column(category))
+        if tag is not None:
+            sql += " AND seq IN (SELECT item FROM item_tags WHERE tag = ?)"
+            params.append(_column(tag))
+        sql += " ORDER BY seq"
+        with self.transaction() as conn:
+            for item_type in item_types:
+                for row_type, data in conn.execute(sql, [item_type, *params]):
+                    yield row_type, json.loads(data)
+
+    def find(self, item_type: str, name=None, category=None, tag=None) -> List[Dict]:
+        """Indexed lookup; same filters as `find_in_config()`"""
+        if item_type != "category":
+            return [item for _, item in self.iter_items((item_type,), name, category, tag)]
+        if not self.exists():
+            return []
+        sql, params = "SELECT data FROM categories", []
+        if name is not None:
+            sql += " WHERE id = ?"
+            params.append(_column(name))
+        with self.transaction() as conn:
+            return [json.loads(data) for (data,) in conn.execute(sql + " ORDER BY seq", params)]
+
+    def backup(self):
+        """Move the database aside to ``config.db.bak``"""
+        move_aside(self.path)
+
+    def restore(self):
+        """Undo `backup()`"""
+        os.replace(backup_path(self.path), self.path)
+
+    def discard(self):
+        """Delete the database (a migration target that failed), with the
+        rollback journal SQLite may have left next to it"""
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            remove_path(self.path.with_name(self.path.name + suffix))
+
+class JournaledStorage:
+    """A snapshot storage plus the mutation journal next to config.json
+
+    `load()` replays the journal on top of the snapshot. `save()` writes a
+    full snapshot and then empties the journal, which is also how
+    `compact()` folds it in. Other attributes (``kind``, ``directory``...)
+    come from the snapshot storage.
+    """
+
+    def __init__(self, snapshot, journal: MutationJournal):
+        self.snapshot = snapshot
+        self.journal = journal
+        self._view = None
+
+    def __getattr__(self, name):
+        return getattr(self.snapshot, name)
+
+    @property
+    def watch_paths(self) -> List[Path]:
+        """Files whose mtime changes on every save or journaled edit"""
+        return [self.snapshot.watch_path, self.journal.path]
+
+    def exists(self) -> bool:
+        return self.snapshot.exists()
+
+    def snapshot_digest(self) -> Optional[str]:
+        """sha256 of the file every snapshot save rewrites, or None"""
+        digest = hashlib.sha256()
+        try:
+            with open(self.snapshot.watch_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            return None
+        return digest.hexdigest()
+
+    def pending_entries(self) -> List[Dict]:
+        """Journal entries not yet in the snapshot (see journal.py)"""
+        if not self.journal.size():
+            return []
+        return pending_entries(self.journal.entries(), self.snapshot_digest)
+
+    def load(self) -> Dict:
+        config = self.snapshot.load()
+        entries = self.pending_entries()
+        if entries:
+            replay(config, entries)
+        return config
+
+    def _loaded(self) -> Dict:
+        """Config shared by the read-only helpers below, loaded once"""
+        if self._view is None:
+            self._view = self.load()
+        return self._view
+
+    def save(self, config: Dict) -> List[Path]:
+        """Write a full snapshot of `config` and empty the journal
+
+        `config` must already include the journal's changes (i.e. come
+        from `load()`). A checkpoint is journaled first, so if the journal
+        outlives the new snapshot (a crash) its entries aren't replayed twice.
+        """
+        if self.journal.size():
+            self.journal.append(checkpoint_entry(self.snapshot_digest()))
+        written = self.snapshot.save(config)
+        self.journal.clear()
+        self._view = None
+        return written
+
+    def apply(self, entries: List[Dict]):
+        """Record mutations with one journal write, without rewriting the snapshot"""
+        self.journal.extend(entries)
+        self._view = None
+
+    def append(self, entry: Dict) -> Path:
+        """Record one mutation; returns the file it went to"""
+        self.apply([entry])
+        return self.journal.path
+
+    def site(self) -> Dict:
+        return self._loaded().get('site', {})
+
+    def categories(self) -> List[Dict]:
+        return self._loaded().get('categories', [])
+
+    def count(self, item_type: str) -> int:
+        return len(self._loaded().get(ITEM_KEYS[item_type], []))
+
+    def category_counts(self) -> Dict[str, int]:
+        return count_categories(self._loaded())
+
+    def iter_items(self, item_types=tuple(ITEM_KEYS), name=None, category=None, tag=None) -> Iterator[Tuple[str, Dict]]:
+        """Scan the loaded config; see `iter_config_items()`"""
+        return iter_config_items(self._loaded(), item_types, name, category, tag)
+
+    def find(self, item_type: str, name=None, category=None, tag=None) -> List[Dict]:
+        """Lookup by scanning the loaded config; see `find_in_config()`"""
+        return find_in_config(self._loaded(), item_type, name, category, tag)
+
+    def needs_compaction(self) -> bool:
+        return self.journal.size() > JOURNAL_COMPACT_BYTES
+
+    def compact(self) -> List[Path]:
+        """Fold the journal into a new snapshot; returns the files written"""
+        if not self.journal.size():
+            return []
+        return self.save(self.load())
+
+def sharded_dir(config_file: Path) -> Path:
+    """Directory of the sharded layout that belongs to `config_file`"""
+    config_file = Path(config_file)
+    return config_file.with_name(config_file.stem + SHARDED_DIR_SUFFIX)
+
+def sqlite_path(config_file: Path) -> Path:
+    """Database of the SQLite layout that belongs to `config_file`"""
+    return Path(config_file).with_suffix(".db")
+
+def snapshot_storage(config_file: Path, kind: str):
+    """Storage of layout `kind` for `config_file`, without the journal"""
+    if kind == "json":
+        return JsonStorage(config_file)
+    if kind == "sharded":
+        return ShardedStorage(sharded_dir(config_file))
+    if kind == "sqlite":
+        return SqliteStorage(sqlite_path(config_file))
+    raise ValueError(f"unknown storage layout '{kind}'")
+
+def open_storage(config_file: Path):
+    """Return the storage for `config_file`
+
+    A SQLite database (``config.db`` next to ``config.json``) wins when it
+    exists, then the sharded layout (``config.d/``) when its manifest
+    exists; otherwise the single file is used. The two file layouts replay
+    the mutation journal (``config.journal``) on load.
+    """
+    database = sqlite_path(config_file)
+    if database.exists():
+        return SqliteStorage(database)
+    journal = MutationJournal(journal_path(config_file))
+    sharded = ShardedStorage(sharded_dir(config_file))
+    if sharded.exists():
+        return JournaledStorage(sharded, journal)
+    return JournaledStorage(JsonStorage(config_file), journal)
+
+def migrate(config_file: Path, to: str) -> List[Path]:
+    """Convert between the single-file, sharded and SQLite layouts
+
+    The source is kept as a ``.bak`` next to it (replacing an older one)
+    and pending journal entries are folded into the new layout. The source
+    is moved aside before the target is written, and put back if anything
+    fails, so the two layouts never exist side by side. Returns the files
+    written.
+    """
+    config_file = Path(config_file)
+    source = open_storage(config_file)
+    if source.kind == to:
+        raise ValueError(f"config is already stored as {to}")
+    if not source.exists():
+        raise FileNotFoundError(config_file)
+
+    config = source.load()
+    target = snapshot_storage(config_file, to)
+    source.backup()
+    try:
+        written = target.save(config)
+        if source.journal is not None:
+            source.journal.clear()
+    except BaseException:
+        target.discard()
+        source.restore()
+        raise
+    return written
@@ -0,0 +1,106 @@
+"""
+HF Site Builder - lightweight stage timer for startup reports
+
+    timer = StartupTimer.from_env()
+    with timer.stage("load_config") as stage:
+        config = load_config()
+        stage.add(items=len(config['models']))
+    timer.report(extra)
+
+Stages may nest and repeat: each stage's time is exclusive of the stages
+nested inside it, and repeated entries accumulate. When timing is off,
+`from_env()` returns a `NullTimer` whose `stage()` hands back a shared
+no-op context, so instrumented code pays one method call per stage.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+TIMINGS_ENV = "HF_SITE_TIMINGS"
+TIMINGS_FILE_ENV = "HF_SITE_TIMINGS_FILE"
+
+class Stage:
+    """Accumulated time and counters for one named stage"""
+    __slots__ = ("seconds", "calls", "counts")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.counts = {}
+
+    def add(self, **counts):
+        """Add to this stage's counters (e.g. ``html_bytes=len(html)``)"""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def to_dict(self):
+        return {"seconds": round(self.seconds, 6), "calls": self.calls, **self.counts}
+
+class _NullStage:
+    __slots__ = ()
+
+    def add(self, **counts):
+        pass
+
+_NULL_STAGE_CONTEXT = nullcontext(_NullStage())
+
+class NullTimer:
+    """Timer used when reporting is off; every operation is a no-op"""
+    enabled = False
+
+    def stage(self, name):
+        return _NULL_STAGE_CONTEXT
+
+    def report(self, extra=None):
+        return None
+
+class StartupTimer:
+    """Records per-stage durations and counters and emits a JSON report"""
+    enabled = True
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.stages = {}
+        self._started = time.perf_counter()
+        self._stack = []
+
+    @classmethod
+    def from_env(cls):
+        """Return a StartupTimer if HF_SITE_TIMINGS or HF_SITE_TIMINGS_FILE is set,
+        otherwise a NullTimer"""
+        path = os.environ.get(TIMINGS_FILE_ENV)
+        if os.environ.get(TIMINGS_ENV) or path:
+            return cls(path)
+        return NullTimer()
+
+    @contextmanager
+    def stage(self, name):
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = Stage()
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            record.seconds += elapsed - self._stack.pop()
+            record.calls += 1
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def report(self, extra=None):
+        """Print the report as one JSON line (and write it to the file, if set)"""
+        report = {
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+            **(extra or {}),
+        }
+        text = json.dumps(report, ensure_ascii=False)
+        print(text, flush=True)
+        if self.path:
+            self.path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding='utf-8')
+        return report
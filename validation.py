@@ -0,0 +1,218 @@
+"""
+HF Site Builder - configuration validation engine
+
+Shared by ``builder.py validate`` and the GUI's Validate button:
+
+    report = validate(config)
+    report.ok            # no errors (warnings are allowed)
+    report.to_dict()     # machine-readable report, with timings
+
+Category, name and repo checks are hashed lookups, so a run is linear in
+the number of items. Passing `changed` (the items edited since the last
+clean run, e.g. from the mutation journal) restricts every item rule to
+those items; they are still compared against the whole catalog for
+duplicates.
+"""
+
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# Part of the incremental state: a clean run under older rules doesn't count
+RULES_VERSION = 1
+
+REQUIRED_ITEM_FIELDS = ("name", "repo", "category")
+REQUIRED_CATEGORY_FIELDS = ("id", "name")
+URL_FIELDS = {"model": ("demo_url", "paper_url"), "dataset": ()}
+ITEM_SECTIONS = (("model", "models"), ("dataset", "datasets"))
+# Hugging Face ids: "owner/name" of letters, digits, '-', '_' and '.', not
+# starting or ending with a separator
+REPO_PATTERN = re.compile(r'[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?/[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?')
+
+class Issue:
+    """One validation finding"""
+    __slots__ = ("severity", "rule", "message", "item_type", "name")
+
+    def __init__(self, severity, rule, message, item_type=None, name=None):
+        self.severity = severity
+        self.rule = rule
+        self.message = message
+        self.item_type = item_type
+        self.name = name
+
+    def to_dict(self):
+        return {
+            "severity": self.severity,
+            "rule": self.rule,
+            "message": self.message,
+            "type": self.item_type,
+            "name": self.name,
+        }
+
+class Report:
+    """Issues plus counters and per-phase timings of one validation run"""
+
+    def __init__(self):
+        self.issues: List[Issue] = []
+        self.stats = {"categories": 0, "items": 0, "checked": 0}
+        self.timings = {}
+
+    def add(self, severity, rule, message, item_type=None, name=None):
+        self.issues.append(Issue(severity, rule, message, item_type, name))
+
+    @property
+    def errors(self) -> List[Issue]:
+        return [issue for issue in self.issues if issue.severity == "error"]
+
+    @property
+    def warnings(self) -> List[Issue]:
+        return [issue for issue in self.issues if issue.severity == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def to_dict(self):
+        return {
+            "valid": self.ok,
+            "errors": len(self.errors),
+            "warnings": len(self.warnings),
+            "stats": self.stats,
+            "timings": {name: round(seconds, 6) for name, seconds in self.timings.items()},
+            "issues": [issue.to_dict() for issue in self.issues],
+        }
+
+def is_blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def hashable(value):
+    """`value`, or its repr for lists/dicts, so it can go in a set"""
+    return repr(value) if isinstance(value, (list, dict)) else value
+
+def count_values(items: List[Dict], field: str) -> Counter:
+    """How many items have each value of `field`"""
+    values = [item.get(field) for item in items]
+    try:
+        return Counter(values)
+    except TypeError:  # a list or dict somewhere
+        return Counter(map(hashable, values))
+
+def is_valid_url(value) -> bool:
+    """An absolute http(s) URL with a host"""
+    if not isinstance(value, str):
+        return False
+    value = value.strip()
+    scheme, sep, rest = value.partition("://")
+    if sep and scheme in ("http", "https"):
+        # Same answer as urlparse's netloc check, without the parsing
+        return bool(rest) and rest[0] not in "/?#"
+    parsed = urlparse(value)
+    return parsed.scheme in ("http", "https") and bool(parsed.netloc)
+
+def check_item(item_type: str, item: Dict) -> List[Issue]:
+    """Rules that only need the item itself"""
+    found = []
+    for field in REQUIRED_ITEM_FIELDS:
+        if is_blank(item.get(field)):
+            found.append(("error", "empty_field", f"has an empty '{field}'"))
+    repo = item.get('repo')
+    if not is_blank(repo) and not (isinstance(repo, str) and REPO_PATTERN.fullmatch(repo)):
+        found.append(("error", "malformed_repo", f"has a malformed repo (expected username/repo): {repo}"))
+    for field in URL_FIELDS[item_type]:
+        url = item.get(field)
+        if not is_blank(url) and not is_valid_url(url):
+            found.append(("warning", "bad_url", f"has an invalid {field}: {url}"))
+    if not found:
+        return found
+    label = f"{item_type.capitalize()} '{item.get('name')}'"
+    return [Issue(severity, rule, f"{label} {text}", item_type, item.get('name')) for severity, rule, text in found]
+
+def validate(config: Dict, changed: Optional[Iterable[Tuple[str, Dict]]] = None) -> Report:
+    """Validate a config dict
+
+    With `changed`, a list of ``(item type, item)`` pairs, only those items
+    are checked (incremental mode); the site and categories always are.
+    """
+    report = Report()
+    started = phase = time.perf_counter()
+
+    def lap(name):
+        nonlocal phase
+        now = time.perf_counter()
+        report.timings[name] = now - phase
+        phase = now
+
+    # Sections, site and categories
+    if 'site' not in config:
+        report.add("error", "missing_section", "Missing 'site' section")
+    if 'categories' not in config:
+        report.add("error", "missing_section", "Missing 'categories' section")
+    for network, url in ((config.get('site') or {}).get('social_links') or {}).items():
+        if not is_blank(url) and not is_valid_url(url):
+            report.add("warning", "bad_url", f"Site has an invalid {network} link: {url}")
+
+    category_ids = set()
+    for category in config.get('categories', []):
+        category_id = hashable(category.get('id'))
+        for field in REQUIRED_CATEGORY_FIELDS:
+            if is_blank(category.get(field)):
+                report.add("error", "empty_field", f"Category '{category_id}' has an empty '{field}'", "category", category_id)
+        if category_id in category_ids:
+            report.add("error", "duplicate_category", f"Duplicate category id: {category_id}", "category", category_id)
+        category_ids.add(category_id)
+    report.stats["categories"] = len(config.get('categories', []))
+    lap("categories")
+
+    changed = list(changed) if changed is not None else None
+    for item_type, key in ITEM_SECTIONS:
+        items = config.get(key, [])
+        report.stats["items"] += len(items)
+        if changed is None:
+            subjects = items
+        else:
+            subjects = [item for changed_type, item in changed if changed_type == item_type]
+        report.stats["checked"] += len(subjects)
+
+        # Per-item rules
+        for item in subjects:
+            report.issues.extend(check_item(item_type, item))
+        lap(f"{key}_items")
+
+        # Across items. Counting every name and repo in one pass is much
+        # cheaper than testing them one at a time; only the subjects that
+        # collide or miss a category are looked at again.
+        label = item_type.capitalize()
+        names = count_values(items, 'name')
+        repos = count_values(items, 'repo')
+        subject_names = names if changed is None else set(map(hashable, (item.get('name') for item in subjects)))
+        subject_repos = repos if changed is None else set(map(hashable, (item.get('repo') for item in subjects)))
+        subject_categories = (
+            count_values(items, 'category') if changed is None
+            else set(map(hashable, (item.get('category') for item in subjects)))
+        )
+        unknown = set(subject_categories) - category_ids
+        # With every value distinct (the usual case) there is nothing to look for
+        duplicate_names = set() if len(names) == len(items) else {
+            name for name in subject_names if names[name] > 1 and not is_blank(name)
+        }
+        duplicate_repos = set() if len(repos) == len(items) else {
+            repo for repo in subject_repos if isinstance(repo, str) and repos[repo] > 1 and not is_blank(repo)
+        }
+
+        if unknown or duplicate_names or duplicate_repos:
+            for item in subjects:
+                name, repo = hashable(item.get('name')), hashable(item.get('repo'))
+                if hashable(item.get('category')) in unknown:
+                    report.add("error", "unknown_category", f"{label} '{name}' has invalid category: {item.get('category')}", item_type, name)
+                if name in duplicate_names:
+                    duplicate_names.discard(name)
+                    report.add("error", "duplicate_name", f"Duplicate {item_type} name: {name} ({names[name]} items)", item_type, name)
+                if repo in duplicate_repos:
+                    duplicate_repos.discard(repo)
+                    report.add("error", "duplicate_repo", f"Duplicate {item_type} repo: {repo} ({repos[repo]} items)", item_type, name)
+        lap(f"{key}_cross")
+
+    report.timings["total"] = time.perf_counter() - started
+    return report
@@ -0,0 +1,81 @@
+"""
+HF Site Builder - config file watcher
+
+Polls the config files' modification times and sizes from a daemon thread
+and calls back when any of them changes. Polling works on every platform and
+filesystem (including the overlay filesystems Spaces run on), and one
+``stat()`` every couple of seconds is negligible.
+"""
+
+import threading
+from pathlib import Path
+
+class ConfigWatcher:
+    """Call `on_change()` whenever the file at `path` changes
+
+    `path` may also be a list of files (e.g. the snapshot and the journal);
+    a missing file is a valid state, so one appearing or disappearing
+    counts as a change.
+
+    Exceptions raised by the callback (e.g. a half-written file failing to
+    parse) are reported and the previous state is kept; the next change
+    triggers another attempt.
+    """
+
+    def __init__(self, path, on_change, interval=2.0):
+        paths = path if isinstance(path, (list, tuple)) else [path]
+        self.paths = [Path(p) for p in paths]
+        self.path = self.paths[0]
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._signature = self._stat()
+
+    @staticmethod
+    def _stat_one(path):
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _stat(self):
+        signature = tuple(self._stat_one(p) for p in self.paths)
+        # Without the main file there is nothing to reload
+        return signature if signature[0] is not None else None
+
+    def reset(self):
+        """Take the files' current state as unchanged (e.g. after writing them ourselves)"""
+        self._signature = self._stat()
+
+    def check(self):
+        """Poll once; return True if a change was detected and handled"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"⚠️ Reload of {self.path} failed: {e}")
+            return False
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None